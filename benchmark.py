@@ -0,0 +1,290 @@
+import json
+import os
+import random
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+from completeness import Completeness_Ranker
+from data_handler import Data_Handler
+from panel import Panel
+
+
+class Standin_World_Bank_API:
+    """
+    Local HTTP server mimicking the World Bank API endpoints used by Completeness_Ranker,
+    so fetching can be exercised offline. Serves `n_indicators` synthetic indicators
+    for source `source`, each with roughly 70% of country-years filled, and waits
+    `latency` seconds before every response.
+    """
+
+    def __init__(self, source=80, n_indicators=50, n_countries=200, latency=0.05):
+        self.source = source
+        self.codes = [f"SYN.IND.{i}" for i in range(n_indicators)]
+        self.countries = [f"Country {i}" for i in range(n_countries)]
+        self.latency = latency
+        self.last_updated = "2025-01-01"
+        self.requests = 0
+        self._server = None
+
+    def _body(self, path, query):
+        parts = path.strip('/').split('/')
+        if parts[-3:] == ['sources', str(self.source), 'indicators']:
+            rows = [{"id": code, "name": f"Synthetic indicator {code}"} for code in self.codes]
+        elif parts[-2:] == ['sources', str(self.source)]:
+            rows = [{"id": str(self.source), "name": "Synthetic source", "lastupdated": self.last_updated}]
+        elif parts[-2] == 'indicators' and parts[-1] in self.codes:
+            start, end = map(int, query['date'][0].split(':'))
+            rnd = random.Random(parts[-1])
+            rows = [
+                {"indicator": {"id": parts[-1]}, "country": {"value": country}, "date": str(year),
+                 "value": rnd.random() if rnd.random() < 0.7 else None}
+                for country in self.countries for year in range(end, start - 1, -1)
+            ]
+        else:
+            return [{"message": [{"id": "120", "key": "Invalid value", "value": "Unknown path"}]}]
+
+        per_page = int(query.get('per_page', ['50'])[0])
+        page = int(query.get('page', ['1'])[0])
+        pages = max(1, -(-len(rows) // per_page))
+        header = {"page": page, "pages": pages, "per_page": per_page, "total": len(rows),
+                  "lastupdated": self.last_updated}
+        return [header, rows[(page - 1) * per_page:page * per_page]]
+
+    def start(self):
+        """
+        Starts serving in a background thread and returns the base URL.
+        """
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                time.sleep(api.latency)
+                api.requests += 1
+                url = urlparse(self.path)
+                body = json.dumps(api._body(url.path, parse_qs(url.query))).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class Benchmark:
+    @staticmethod
+    def time_call(func, repeats=5):
+        """
+        Runs func `repeats` times and returns the best wall-clock time in seconds.
+        """
+        best = float('inf')
+        for _ in range(repeats):
+            start = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    @staticmethod
+    def peak_memory(func):
+        """
+        Runs func once and returns the peak memory allocated through Python, in bytes.
+        """
+        tracemalloc.start()
+        try:
+            func()
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    @staticmethod
+    def _EPI_loop_baseline(indicators, start_year, end_year, folder_path='P5_Indicator'):
+        """
+        The EPI loader as it was before the thread pool: one file after another, each melted
+        with df.melt and its years parsed with a per-row str.split.
+        """
+        all_dfs = []
+        for var, var_name in indicators.items():
+            df = pd.read_csv(os.path.join(folder_path, f"{var}_ind_na.csv"))
+            df.columns = df.columns.str.strip().str.lower().str.replace(' ', '_')
+            year_cols = [col for col in df.columns if col.startswith(var.lower() + '.ind.')]
+
+            long_df = df.melt(id_vars=['iso', 'country'], value_vars=year_cols,
+                              var_name='metric_year', value_name='value')
+            long_df['year'] = long_df['metric_year'].str.split('.').str[-1].astype(int)
+            long_df['variable'] = var
+            long_df['variable_name'] = var_name
+            all_dfs.append(long_df.drop(columns='metric_year'))
+
+        result = pd.concat(all_dfs, ignore_index=True)
+        result = result[(result['year'] >= start_year) & (result['year'] <= end_year)]
+        return result.reset_index(drop=True)
+
+    @staticmethod
+    def benchmark_EPI_loading(folder_path='P5_Indicator', max_workers=None, repeats=5):
+        """
+        Compares loading every EPI indicator file with the original per-file melt loop against
+        the current loader, run serially and on the thread pool.
+
+        Returns:
+            dict: Best times in seconds for the original loop and the serial and concurrent
+                loads, and the speedup of the concurrent load over the original loop.
+        """
+        indicators = Data_Handler.get_EPI_indicators(folder_path)
+
+        baseline = Benchmark.time_call(
+            lambda: Benchmark._EPI_loop_baseline(indicators, 1990, 2024, folder_path),
+            repeats
+        )
+        serial = Benchmark.time_call(
+            lambda: Data_Handler.get_data_EPI(indicators, start_year=1990, end_year=2024,
+                                              folder_path=folder_path, max_workers=1),
+            repeats
+        )
+        concurrent = Benchmark.time_call(
+            lambda: Data_Handler.get_data_EPI(indicators, start_year=1990, end_year=2024,
+                                              folder_path=folder_path, max_workers=max_workers),
+            repeats
+        )
+
+        speedup = baseline / concurrent
+        print(f"EPI loading ({len(indicators)} indicators): original loop {baseline * 1000:.1f} ms, "
+              f"serial {serial * 1000:.1f} ms, concurrent {concurrent * 1000:.1f} ms, "
+              f"speedup {speedup:.2f}x over the original loop")
+        return {'baseline': baseline, 'serial': serial, 'concurrent': concurrent, 'speedup': speedup}
+
+    @staticmethod
+    def benchmark_filter_pushdown(hdi_path='HDR25_Composite_indices_complete_time_series.csv',
+                                  folder_path='P5_Indicator', country='Albania',
+                                  start_year=2010, end_year=2015, repeats=5):
+        """
+        Compares a single-country, short year range query answered with filters pushed
+        down to the wide tables against loading everything and filtering the long frame.
+
+        Returns:
+            dict: Best time (s) and peak memory (bytes) per loader and strategy.
+        """
+        hdi_indicators = {"gii": "GII", "pr_f": "Shares of seats in the parliament, female",
+                          "lfpr_f": "Labour force participation, female",
+                          "se_f": "Population with secondary education, female"}
+        epi_indicators = Data_Handler.get_EPI_indicators(folder_path)
+
+        def filter_after(long_df):
+            return long_df[(long_df['country'] == country)
+                           & (long_df['year'] >= start_year) & (long_df['year'] <= end_year)]
+
+        cases = {
+            'HDI': (
+                lambda: Data_Handler.get_data_HDI(hdi_path, hdi_indicators, country, start_year, end_year),
+                lambda: filter_after(Data_Handler.get_data_HDI(hdi_path, hdi_indicators)),
+            ),
+            'EPI': (
+                lambda: Data_Handler.get_data_EPI(epi_indicators, country, start_year, end_year,
+                                                  folder_path=folder_path),
+                lambda: filter_after(Data_Handler.get_data_EPI(epi_indicators, folder_path=folder_path)),
+            ),
+        }
+
+        results = {}
+        for name, (pushdown, full) in cases.items():
+            results[name] = {
+                'pushdown_time': Benchmark.time_call(pushdown, repeats),
+                'full_time': Benchmark.time_call(full, repeats),
+                'pushdown_memory': Benchmark.peak_memory(pushdown),
+                'full_memory': Benchmark.peak_memory(full),
+            }
+            r = results[name]
+            print(f"{name} filter pushdown: {r['pushdown_time'] * 1000:.1f} ms / "
+                  f"{r['pushdown_memory'] / 2 ** 20:.1f} MiB peak vs load-then-filter "
+                  f"{r['full_time'] * 1000:.1f} ms / {r['full_memory'] / 2 ** 20:.1f} MiB peak")
+        return results
+
+    @staticmethod
+    def benchmark_concurrent_fetch(n_indicators=50, latency=0.05, max_workers=8):
+        """
+        Ranks a synthetic source served by Standin_World_Bank_API one indicator at a time
+        and with `max_workers` concurrent fetches, checking both give the same result.
+
+        Returns:
+            dict: Wall-clock times in seconds for both modes and the speedup.
+        """
+        api = Standin_World_Bank_API(n_indicators=n_indicators, latency=latency)
+        base_url = api.start()
+        try:
+            times, outputs = {}, {}
+            for workers in (1, max_workers):
+                start = time.perf_counter()
+                outputs[workers] = Completeness_Ranker.rank_indicators_by_completeness(
+                    api.source, cache_path=None, base_url=base_url, max_workers=workers
+                )
+                times[workers] = time.perf_counter() - start
+        finally:
+            api.stop()
+
+        (serial_summary, serial_df), (summary, df) = outputs[1], outputs[max_workers]
+        assert serial_summary.equals(summary) and serial_df.equals(df)
+
+        speedup = times[1] / times[max_workers]
+        print(f"Completeness ranking ({n_indicators} indicators, {latency * 1000:.0f} ms latency): "
+              f"serial {times[1]:.2f} s, {max_workers} workers {times[max_workers]:.2f} s, "
+              f"speedup {speedup:.2f}x")
+        return {'serial': times[1], 'concurrent': times[max_workers], 'speedup': speedup}
+
+    @staticmethod
+    def benchmark_interpolation(panel=None, repeats=5):
+        """
+        Compares the notebook's groupby('country').apply(interpolate) gap filling against
+        Panel.interpolate on the same data, checking both give the same values.
+
+        Args:
+            panel (Panel): Panel to interpolate, defaults to Data_Handler.build_panel's
+                HDI and EPI indicators for 1990-2024.
+
+        Returns:
+            dict: Best times in seconds for both methods and the speedup.
+        """
+        if panel is None:
+            panel = Panel.from_frame(Data_Handler.build_panel(
+                hdi_indicators={"gii": "GII", "pr_f": "Shares of seats in the parliament, female",
+                                "lfpr_f": "Labour force participation, female",
+                                "se_f": "Population with secondary education, female"},
+                epi_indicators=Data_Handler.get_EPI_indicators('P5_Indicator'),
+            ))
+        data = panel.to_frame().astype({name: np.float64 for name in panel.indicators})
+
+        def groupby_apply():
+            return (data.sort_values(['country', 'year'])
+                    .groupby('country', group_keys=False)[panel.indicators]
+                    .apply(lambda g: g.interpolate(method='linear', limit_direction='both')))
+
+        expected = groupby_apply().sort_index().to_numpy()
+        actual = Panel.interpolate_array(panel.values.astype(np.float64))
+        assert np.allclose(actual.reshape(expected.shape), expected, equal_nan=True)
+
+        baseline = Benchmark.time_call(groupby_apply, repeats)
+        vectorized = Benchmark.time_call(panel.interpolate, repeats)
+        speedup = baseline / vectorized
+        print(f"Interpolation ({panel}): groupby-apply {baseline * 1000:.1f} ms, "
+              f"vectorized {vectorized * 1000:.1f} ms, speedup {speedup:.1f}x")
+        return {'groupby_apply': baseline, 'vectorized': vectorized, 'speedup': speedup}
+
+
+if __name__ == '__main__':
+    Benchmark.benchmark_EPI_loading()
+    Benchmark.benchmark_filter_pushdown()
+    Benchmark.benchmark_concurrent_fetch()
+    Benchmark.benchmark_interpolation()
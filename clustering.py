@@ -0,0 +1,286 @@
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import linear_sum_assignment
+from sklearn.cluster import KMeans, kmeans_plusplus
+from sklearn.decomposition import PCA
+from sklearn.metrics import calinski_harabasz_score, silhouette_score
+from sklearn.preprocessing import StandardScaler
+
+# Seed of every k-means fit, as in the notebook
+RANDOM_STATE = 42
+
+
+class Cluster_Analysis:
+    _sweep_cache = {}
+
+    @staticmethod
+    def standardize(df):
+        """
+        Standardises every column to zero mean and unit variance once, for reuse by every fit.
+
+        Returns:
+            tuple: (scaled float64 matrix, fitted StandardScaler)
+        """
+        scaler = StandardScaler()
+        return scaler.fit_transform(np.asarray(df, dtype=np.float64)), scaler
+
+    @staticmethod
+    def matrix_hash(X, *params):
+        """
+        Returns a digest of a matrix's shape, dtype and contents plus any extra parameters.
+        """
+        X = np.ascontiguousarray(X)
+        digest = hashlib.sha256(f"{X.shape}|{X.dtype}|{params}".encode("utf-8"))
+        digest.update(X.tobytes())
+        return digest.hexdigest()
+
+    @staticmethod
+    def _fit_k(X, k, init, random_state):
+        """
+        Fits k-means for one k and scores it. Process pools pickle it by its qualified name.
+        """
+        if init is None:
+            kmeans = KMeans(n_clusters=k, random_state=random_state)
+        else:
+            kmeans = KMeans(n_clusters=k, init=init, n_init=1, random_state=random_state)
+        labels = kmeans.fit_predict(X)
+
+        # Both scores need at least two clusters and fewer clusters than points
+        n_labels = len(np.unique(labels))
+        scored = 1 < n_labels < len(X)
+        return {
+            'k': k,
+            'inertia': kmeans.inertia_,
+            'silhouette': silhouette_score(X, labels) if scored else np.nan,
+            'calinski_harabasz': calinski_harabasz_score(X, labels) if scored else np.nan,
+        }
+
+    @staticmethod
+    def k_sweep(df, max_clusters=10, min_clusters=1, warm_start=True, random_state=RANDOM_STATE,
+                max_workers=None, use_cache=True):
+        """
+        Fits k-means for every k from `min_clusters` to `max_clusters` on the standardised data
+        and scores each fit, replacing the notebook's elbow loop.
+
+        The data is standardised once. With `warm_start` every k starts from the first k centres
+        of one k-means++ seeding for `max_clusters`, so the fits share their seeds and each needs
+        a single initialisation; without it every k is seeded independently like
+        KMeans(random_state=42). Fits run in a process pool of `max_workers` processes
+        (1 runs them in this process). Results are cached in memory by the hash of the scaled
+        matrix and the sweep parameters, so asking again for the same data does not refit.
+
+        Args:
+            df (pd.DataFrame | np.ndarray): Countries (rows) x features, without missing values.
+            max_clusters (int): Largest k.
+            min_clusters (int): Smallest k.
+            warm_start (bool): Seed every k from one shared k-means++ seeding.
+            random_state (int): Seed of the seeding and the fits.
+            max_workers (int): Number of processes, None for the ProcessPoolExecutor default.
+            use_cache (bool): Whether to reuse and store results in the in-memory cache.
+
+        Returns:
+            pd.DataFrame: Index k, columns ['inertia', 'silhouette', 'calinski_harabasz'].
+                Scores are NaN where they are undefined, e.g. for k=1.
+        """
+        X, _ = Cluster_Analysis.standardize(df)
+        max_clusters = min(max_clusters, len(X))
+        if min_clusters < 1 or min_clusters > max_clusters:
+            raise ValueError(f"Need 1 <= min_clusters <= max_clusters <= number of rows ({len(X)}), "
+                             f"got min_clusters={min_clusters}, max_clusters={max_clusters}")
+        key = Cluster_Analysis.matrix_hash(X, min_clusters, max_clusters, warm_start, random_state)
+        if use_cache and key in Cluster_Analysis._sweep_cache:
+            return Cluster_Analysis._sweep_cache[key].copy()
+
+        ks = range(min_clusters, max_clusters + 1)
+        inits = {k: None for k in ks}
+        if warm_start:
+            centers, _ = kmeans_plusplus(X, n_clusters=max_clusters, random_state=random_state)
+            inits = {k: centers[:k] for k in ks}
+
+        if max_workers == 1:
+            rows = [Cluster_Analysis._fit_k(X, k, inits[k], random_state) for k in ks]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = [executor.submit(Cluster_Analysis._fit_k, X, k, inits[k], random_state) for k in ks]
+                rows = [future.result() for future in futures]
+
+        sweep = pd.DataFrame(rows).set_index('k')
+        if use_cache:
+            Cluster_Analysis._sweep_cache[key] = sweep
+        return sweep.copy()
+
+    @staticmethod
+    def k_means_cluster(df, n_clusters=3, X=None, scaler=None, random_state=RANDOM_STATE):
+        """
+        K-means on the standardised data, as the notebook's k_means_cluster but without plotting.
+
+        Args:
+            df (pd.DataFrame): Countries (index) x features, without missing values.
+            n_clusters (int): Number of clusters.
+            X, scaler: Output of standardize(df), computed here when not given.
+
+        Returns:
+            tuple: (labels, centroids_df in the original units (also the heatmap data),
+                    feature_importance as the centroid range per feature, sorted descending,
+                    df_with_cluster with a string 'Cluster' column)
+        """
+        if X is None or scaler is None:
+            X, scaler = Cluster_Analysis.standardize(df)
+
+        kmeans = KMeans(n_clusters=n_clusters, random_state=random_state)
+        labels = kmeans.fit_predict(X)
+
+        centroids_df = pd.DataFrame(scaler.inverse_transform(kmeans.cluster_centers_), columns=df.columns)
+        feature_importance = (centroids_df.max() - centroids_df.min()).sort_values(ascending=False)
+
+        df_with_cluster = df.copy()
+        df_with_cluster['Cluster'] = labels.astype(str)
+        return labels, centroids_df, feature_importance, df_with_cluster
+
+    @staticmethod
+    def pca_projection(X, labels, index=None, n_components=2):
+        """
+        Projects standardised data onto its first principal components, the data behind the
+        notebook's plot_pca_clusters.
+
+        Returns:
+            tuple: (DataFrame with columns PC1..PCn and 'Cluster' (str), explained variance
+                    ratio per component in percent)
+        """
+        pca = PCA(n_components=n_components)
+        pca_df = pd.DataFrame(pca.fit_transform(X), index=index,
+                              columns=[f"PC{i + 1}" for i in range(n_components)])
+        pca_df['Cluster'] = np.asarray(labels).astype(str)
+        return pca_df, pca.explained_variance_ratio_ * 100
+
+    @staticmethod
+    def perform_clustering(data, n_clusters=3, n_components=2, random_state=RANDOM_STATE):
+        """
+        Runs the notebook's perform_clustering pipeline headless: the data is standardised once
+        and the scaled matrix is shared by k-means, the centroid feature importance and PCA.
+
+        Args:
+            data (pd.DataFrame): Countries (index) x features, without missing values.
+            n_clusters (int): Number of clusters.
+            n_components (int): Number of principal components for the projection.
+
+        Returns:
+            dict: {'labels', 'centroids' (heatmap data), 'feature_importance',
+                   'countries_per_cluster' ({cluster: [countries]}), 'pca' (projection frame),
+                   'explained_variance' (% per component)}
+        """
+        X, scaler = Cluster_Analysis.standardize(data)
+        labels, centroids, feature_importance, _ = Cluster_Analysis.k_means_cluster(
+            data, n_clusters, X=X, scaler=scaler, random_state=random_state
+        )
+        pca_df, explained_variance = Cluster_Analysis.pca_projection(X, labels, data.index, n_components)
+
+        countries = np.asarray(data.index)
+        return {
+            'labels': labels,
+            'centroids': centroids,
+            'feature_importance': feature_importance,
+            'countries_per_cluster': {int(c): countries[labels == c].tolist() for c in np.unique(labels)},
+            'pca': pca_df,
+            'explained_variance': explained_variance,
+        }
+
+    @staticmethod
+    def _fit_year(df, n_clusters, random_state):
+        """
+        k_means_cluster for one year's snapshot, returning only what cluster_years needs.
+        """
+        labels, centroids, _, _ = Cluster_Analysis.k_means_cluster(df, n_clusters, random_state=random_state)
+        return labels, centroids.to_numpy()
+
+    @staticmethod
+    def align_labels(previous_centroids, centroids, scale=None):
+        """
+        Matches clusters to the previous year's by minimum total centroid distance
+        (Hungarian algorithm).
+
+        Args:
+            previous_centroids (np.ndarray): (k, features) centroids of the previous year.
+            centroids (np.ndarray): (k, features) centroids to relabel.
+            scale (np.ndarray): Per-feature divisor applied before measuring distances, so
+                features in large units do not dominate.
+
+        Returns:
+            np.ndarray: mapping[old label] = aligned label.
+        """
+        scale = 1 if scale is None else scale
+        a, b = previous_centroids / scale, centroids / scale
+        cost = np.sqrt(((a[:, None, :] - b[None, :, :]) ** 2).sum(axis=-1))
+        rows, cols = linear_sum_assignment(cost)
+        mapping = np.empty(len(cols), dtype=np.intp)
+        mapping[cols] = rows
+        return mapping
+
+    @staticmethod
+    def cluster_years(panel, n_clusters=3, indicators=None, start_year=None, end_year=None,
+                      random_state=RANDOM_STATE, max_workers=None):
+        """
+        Clusters every year of a panel and aligns the labels over time.
+
+        Each year's snapshot (countries with a value for every indicator that year) is clustered
+        like k_means_cluster, one fit per year in a process pool of `max_workers` processes
+        (1 fits them in this process). Labels are then made consistent from year to year by
+        matching each year's centroids to the previous year's with align_labels, distances
+        measured in units of each feature's standard deviation over the whole panel. Years with
+        fewer countries than clusters are skipped.
+
+        Args:
+            panel (Panel): Panel to cluster, usually after Panel.impute.
+            n_clusters (int): Number of clusters per year.
+            indicators (list): Features, defaults to every indicator of the panel.
+            start_year, end_year (int): Inclusive year range, defaults to every year.
+            random_state (int): Seed of every fit.
+            max_workers (int): Number of processes, None for the ProcessPoolExecutor default.
+
+        Returns:
+            dict: {'labels': DataFrame of aligned labels (Int64), countries (rows) x years (columns),
+                   <NA> where a country was not clustered,
+                   'centroids': DataFrame of centroids in original units indexed by (year, cluster)}
+        """
+        panel = panel.sel(start_year=start_year, end_year=end_year, indicators=indicators)
+        snapshots = {}
+        for year in panel.years:
+            snapshot = panel.year(year).astype(np.float64)
+            # Row positions in the panel, so labels are written back by position, not by name
+            rows = np.flatnonzero(snapshot.notna().all(axis=1).to_numpy())
+            if len(rows) >= n_clusters:
+                snapshots[int(year)] = (rows, snapshot.iloc[rows])
+
+        if max_workers == 1:
+            fits = [Cluster_Analysis._fit_year(df, n_clusters, random_state) for _, df in snapshots.values()]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = [executor.submit(Cluster_Analysis._fit_year, df, n_clusters, random_state)
+                           for _, df in snapshots.values()]
+                fits = [future.result() for future in futures]
+
+        scale = np.nanstd(panel.values.reshape(-1, len(panel.indicators)).astype(np.float64), axis=0)
+        scale = np.where(scale > 0, scale, 1)
+
+        labels = pd.DataFrame(np.nan, index=pd.Index(panel.countries, name='country'),
+                              columns=pd.Index(list(snapshots), name='year'))
+        centroids, previous = [], None
+        for (year, (rows, _)), (year_labels, year_centroids) in zip(snapshots.items(), fits):
+            if previous is not None:
+                mapping = Cluster_Analysis.align_labels(previous, year_centroids, scale)
+                year_labels = mapping[year_labels]
+                year_centroids = year_centroids[np.argsort(mapping)]
+            previous = year_centroids
+
+            labels.iloc[rows, labels.columns.get_loc(year)] = year_labels
+            centroids.append(pd.DataFrame(year_centroids, columns=panel.indicators,
+                                          index=pd.MultiIndex.from_product([[year], range(n_clusters)],
+                                                                           names=['year', 'cluster'])))
+
+        return {
+            'labels': labels.astype('Int64'),
+            'centroids': pd.concat(centroids) if centroids else pd.DataFrame(columns=panel.indicators),
+        }
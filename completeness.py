@@ -1,62 +1,664 @@
+import numpy as np
 import pandas as pd
-import wbdata
 import datetime
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import requests
 import tqdm
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+
+WB_API_URL = "https://api.worldbank.org/v2"
+RESPONSE_CACHE_PATH = '.wb_cache.sqlite'
+PER_PAGE = 1000
+
+
+class Response_Cache:
+    """
+    SQLite store of fetched indicator data, addressed by a hash of the request
+    (indicator code and year range). Every indicator is committed as soon as it is
+    fetched, so an interrupted run resumes where it stopped. The API's 'lastupdated'
+    date is stored alongside, so incremental runs can tell which indicators changed.
+    """
+
+    def __init__(self, path=RESPONSE_CACHE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, indicator TEXT, start_year INTEGER, end_year INTEGER, "
+            "rows TEXT, fetched_at TEXT, last_updated TEXT)"
+        )
+        # Source-level 'lastupdated' dates, to skip per-indicator checks when a source did not change
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sources ("
+            "key TEXT PRIMARY KEY, source TEXT, start_year INTEGER, end_year INTEGER, last_updated TEXT)"
+        )
+        # Caches created before last_updated was tracked
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(responses)")]
+        if 'last_updated' not in columns:
+            self._conn.execute("ALTER TABLE responses ADD COLUMN last_updated TEXT")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(code, start_year, end_year):
+        return hashlib.sha256(f"{code}|{start_year}|{end_year}".encode("utf-8")).hexdigest()
+
+    def get(self, code, start_year, end_year):
+        """
+        Returns (rows, last_updated) cached for an indicator and year range, or None if missing.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT rows, last_updated FROM responses WHERE key = ?",
+                (self.make_key(code, start_year, end_year),)
+            ).fetchone()
+        return None if row is None else ([tuple(r) for r in json.loads(row[0])], row[1])
+
+    def last_updated(self, codes, start_year, end_year):
+        """
+        Returns {code: last_updated} for the indicators cached for a year range, without
+        reading their rows.
+        """
+        result = {}
+        with self._lock:
+            for code in codes:
+                row = self._conn.execute(
+                    "SELECT last_updated FROM responses WHERE key = ?",
+                    (self.make_key(code, start_year, end_year),)
+                ).fetchone()
+                if row is not None:
+                    result[code] = row[0]
+        return result
+
+    def put(self, code, start_year, end_year, rows, last_updated=None):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, indicator, start_year, end_year, rows, fetched_at, last_updated) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (self.make_key(code, start_year, end_year), code, start_year, end_year,
+                 json.dumps(rows), datetime.datetime.now().isoformat(), last_updated)
+            )
+            self._conn.commit()
+
+    def get_source(self, source, start_year, end_year):
+        """
+        Returns the source 'lastupdated' date stored after the last complete run over a year
+        range, or None.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT last_updated FROM sources WHERE key = ?",
+                (self.make_key(f"source:{source}", start_year, end_year),)
+            ).fetchone()
+        return None if row is None else row[0]
+
+    def put_source(self, source, start_year, end_year, last_updated):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sources (key, source, start_year, end_year, last_updated) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (self.make_key(f"source:{source}", start_year, end_year), str(source), start_year, end_year,
+                 last_updated)
+            )
+            self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+
+class Rate_Limiter:
+    """
+    Spaces out calls from any number of threads to at most `rate` per second.
+    """
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate
+        self._lock = threading.Lock()
+        self._next = time.monotonic()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+class Data_Point_Buffer:
+    """
+    Typed columnar accumulator for fetched data points.
+
+    Each indicator's rows are appended as numpy chunks: indicator position (int32),
+    interned country code (int32), year (int16) and value (float64), instead of
+    Python tuples of strings. Completeness can be computed straight from the codes,
+    and the long frame is only built on request.
+    """
+
+    def __init__(self, codes):
+        self.codes = list(codes)
+        self._positions = {code: i for i, code in enumerate(self.codes)}
+        self._countries = {}
+        self._chunks = {}
+
+    def add(self, code, rows):
+        """
+        Appends one indicator's (country, date, value) rows.
+        """
+        countries = self._countries
+        self._chunks[self._positions[code]] = (
+            np.fromiter((countries.setdefault(c, len(countries)) for c, _, _ in rows),
+                        dtype=np.int32, count=len(rows)),
+            np.fromiter((int(d) for _, d, _ in rows), dtype=np.int16, count=len(rows)),
+            np.fromiter((v for _, _, v in rows), dtype=np.float64, count=len(rows)),
+        )
+
+    def __len__(self):
+        return sum(len(values) for _, _, values in self._chunks.values())
+
+    @property
+    def countries(self):
+        return list(self._countries)
+
+    def columns(self):
+        """
+        Returns (indicator positions, country codes, years, values) in indicator order.
+        """
+        order = sorted(self._chunks)
+        chunks = [self._chunks[i] for i in order]
+        lengths = [len(values) for _, _, values in chunks]
+        return (
+            np.repeat(np.array(order, dtype=np.int32), lengths),
+            np.concatenate([c for c, _, _ in chunks] or [np.empty(0, np.int32)]),
+            np.concatenate([y for _, y, _ in chunks] or [np.empty(0, np.int16)]),
+            np.concatenate([v for _, _, v in chunks] or [np.empty(0, np.float64)]),
+        )
+
+    def to_frame(self):
+        """
+        Builds the long ['indicator', 'country', 'date', 'value'] frame with categorical
+        indicator, country and date columns.
+        """
+        indicators, countries, years, values = self.columns()
+        year_labels, year_codes = np.unique(years, return_inverse=True)
+
+        # Countries are interned in arrival order, sort the categories so the frame is deterministic
+        names = np.array(self.countries, dtype=object)
+        order = np.argsort(names)
+        remap = np.empty(len(order), dtype=np.int32)
+        remap[order] = np.arange(len(order), dtype=np.int32)
+
+        return pd.DataFrame({
+            'indicator': pd.Categorical.from_codes(indicators, categories=self.codes),
+            'country': pd.Categorical.from_codes(remap[countries], categories=names[order]),
+            'date': pd.Categorical.from_codes(year_codes, categories=[str(y) for y in year_labels]),
+            'value': values,
+        })
+
 
 class Completeness_Ranker:
-    def rank_indicators_by_completeness(source=80, start_year=2000, end_year=2020, top_n=10):
+    @staticmethod
+    def make_session(pool_size=10):
         """
-        Fetch all indicators from a source and rank them by data completeness.
-        Fetches data in a single call by querying all countries at once.
+        Creates a requests session whose connection pool can serve `pool_size` threads.
         """
-        # Get all indicators for the source
-        indicators = wbdata.get_indicators(source=source)
-        indicator_dict = {ind['id']: ind['name'] for ind in indicators}
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
 
-        print(f"Found {len(indicator_dict)} indicators in source {source}")
-        print("Fetching data for all indicators...")
+    @staticmethod
+    def _get_pages(session, url, params, retries=3, backoff=1.0, timeout=60, rate_limiter=None,
+                   per_page=PER_PAGE, max_pages=None):
+        """
+        Fetch every page (or the first `max_pages`) of a World Bank API query.
 
-        # Fetch data using the API more efficiently - get all data at once
-        try:
-            date_range = (datetime.datetime(start_year, 1, 1), datetime.datetime(end_year, 1, 1))
+        Network errors, HTTP errors and malformed responses are retried up to `retries`
+        times, waiting backoff * 2**attempt seconds in between. Error messages returned
+        by the API itself (e.g. an unknown indicator) are raised immediately.
 
-            # Get data for all indicators by passing them as a list to fetch parameter
-            all_data = []
-            for code in tqdm.tqdm(indicator_dict.keys(), desc="Fetching indicators"):
+        Returns:
+            tuple: (list of rows, the response's 'lastupdated' date string or None)
+        """
+        params = {**params, "format": "json", "per_page": per_page}
+        rows, page, pages, last_updated = [], 0, 1, None
+        while page < pages and (max_pages is None or page < max_pages):
+            params["page"] = page + 1
+            for attempt in range(retries + 1):
+                if rate_limiter is not None:
+                    rate_limiter.wait()
                 try:
-                    data = wbdata.get_data(
-                        code,
-                        date=date_range,
-                        freq='Y'
-                    )
-                    all_data.extend([(code, d['country']['value'], d['date'], d['value'])
-                                     for d in data if d['value'] is not None])
-                except:
+                    response = session.get(url, params=params, timeout=timeout)
+                    response.raise_for_status()
+                    body = response.json()
+                    break
+                except (requests.RequestException, ValueError):
+                    if attempt == retries:
+                        raise
+                    time.sleep(backoff * 2 ** attempt)
+
+            if not isinstance(body, list) or len(body) < 2 or "page" not in body[0]:
+                message = body[0].get("message", body) if isinstance(body, list) and body else body
+                raise RuntimeError(f"World Bank API error for {url}: {message}")
+
+            rows.extend(body[1] or [])
+            page, pages = int(body[0]["page"]), int(body[0]["pages"])
+            last_updated = body[0].get("lastupdated")
+        return rows, last_updated
+
+    @staticmethod
+    def fetch_indicator(session, code, start_year, end_year, base_url=WB_API_URL, retries=3, backoff=1.0,
+                        rate_limiter=None):
+        """
+        Fetch all non-empty yearly data points of an indicator for all countries.
+
+        Returns:
+            tuple: (list of (country name, date, value) tuples, 'lastupdated' date string or None)
+        """
+        data, last_updated = Completeness_Ranker._get_pages(
+            session,
+            f"{base_url}/countries/all/indicators/{code}",
+            {"date": f"{start_year}:{end_year}"},
+            retries, backoff, rate_limiter=rate_limiter
+        )
+        rows = [(d['country']['value'], d['date'], d['value']) for d in data if d['value'] is not None]
+        return rows, last_updated
+
+    @staticmethod
+    def get_last_updated(session, code, start_year, end_year, base_url=WB_API_URL, retries=3, backoff=1.0,
+                         rate_limiter=None):
+        """
+        Ask the API when an indicator was last updated, by requesting a single data point.
+        """
+        _, last_updated = Completeness_Ranker._get_pages(
+            session,
+            f"{base_url}/countries/all/indicators/{code}",
+            {"date": f"{start_year}:{end_year}"},
+            retries, backoff, rate_limiter=rate_limiter, per_page=1, max_pages=1
+        )
+        return last_updated
+
+    @staticmethod
+    def get_source_last_updated(session, source, base_url=WB_API_URL, retries=3, backoff=1.0, rate_limiter=None):
+        """
+        Ask the API when a source was last updated.
+        """
+        rows, _ = Completeness_Ranker._get_pages(
+            session, f"{base_url}/sources/{source}", {}, retries, backoff, rate_limiter=rate_limiter
+        )
+        return rows[0].get("lastupdated") if rows else None
+
+    @staticmethod
+    def _fetch_all(session, codes, start_year, end_year, on_result, cache=None, refresh=False,
+                   base_url=WB_API_URL, retries=3, backoff=1.0, max_workers=8, rate_limiter=None,
+                   incremental=False, probe=None):
+        """
+        Fetch many indicators concurrently, serving cached ones from `cache`.
+
+        With `incremental`, the 'lastupdated' date of every cached indicator in `probe`
+        (default: all of them) is checked against the API first and only indicators whose
+        date moved are fetched again.
+
+        Every indicator's (country, date, value) rows are handed to on_result(code, rows)
+        as soon as they are available, on the calling thread, so they do not have to be
+        kept until all indicators are done.
+
+        Returns:
+            tuple: ({code: error message} for indicators that could not be fetched,
+                    list of cached codes whose date could not be checked)
+        """
+        failures, unchecked = {}, []
+        # Only the dates are loaded up front; cached rows are read one indicator at a time below
+        cached = {} if cache is None or refresh else cache.last_updated(codes, start_year, end_year)
+        missing = [code for code in codes if code not in cached]
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            if incremental and cached:
+                probes = {
+                    executor.submit(Completeness_Ranker.get_last_updated, session, code, start_year, end_year,
+                                    base_url, retries, backoff, rate_limiter): code
+                    for code in cached if probe is None or code in probe
+                }
+                for future in tqdm.tqdm(as_completed(probes), total=len(probes), desc="Checking for updates"):
+                    code = probes[future]
+                    try:
+                        last_updated = future.result()
+                    except (requests.RequestException, ValueError, RuntimeError):
+                        # Keep the cached data if the indicator cannot be checked
+                        unchecked.append(code)
+                        continue
+                    if last_updated is None or last_updated != cached[code]:
+                        missing.append(code)
+                        del cached[code]
+
+                print(f"{len(missing)} of {len(codes)} indicators are new or updated since the last run")
+                if unchecked:
+                    print(f"Could not check {len(unchecked)} indicators for updates, using their cached data")
+
+            for code in cached:
+                rows, _ = cache.get(code, start_year, end_year)
+                on_result(code, rows)
+                del rows
+
+            futures = {
+                executor.submit(Completeness_Ranker.fetch_indicator, session, code, start_year, end_year,
+                                base_url, retries, backoff, rate_limiter): code
+                for code in missing
+            }
+            for future in tqdm.tqdm(as_completed(futures), total=len(futures), desc="Fetching indicators"):
+                code = futures[future]
+                try:
+                    rows, last_updated = future.result()
+                except (requests.RequestException, ValueError, RuntimeError) as e:
+                    failures[code] = str(e)
                     continue
+                # Store each indicator as soon as it arrives so interrupted runs can resume
+                if cache is not None:
+                    cache.put(code, start_year, end_year, rows, last_updated)
+                on_result(code, rows)
+
+        return {code: failures[code] for code in codes if code in failures}, sorted(unchecked)
+
+    @staticmethod
+    def compute_completeness(df, indicator_dict, start_year, end_year):
+        """
+        Completeness of the fetched data per indicator, per country and per year.
+
+        The data frame is encoded into integer codes once and every breakdown is a
+        np.bincount over those codes, so no per-indicator filtering is needed.
+
+        Args:
+            df (pd.DataFrame): Data points with columns ['indicator', 'country', 'date', 'value'].
+            indicator_dict (dict): Mapping from indicator code to name, defines the indicators
+                and their order in the summary.
+            start_year (int): First year of the fetched range.
+            end_year (int): Last year of the fetched range.
+
+        Returns:
+            tuple: (summary with columns ["Indicator Code", "Indicator Name", "Completeness", "Data Points"],
+                    by_country with columns ["Country", "Completeness", "Data Points"],
+                    by_year with columns ["Year", "Completeness", "Data Points"])
+        """
+        # Indicators outside indicator_dict get code -1 and are not counted
+        indicator_codes = pd.Categorical(df['indicator'], categories=list(indicator_dict.keys())).codes
+        country_codes, countries = pd.factorize(df['country'])
+        years = pd.to_numeric(pd.Series(df['date']).astype(str), errors='coerce').to_numpy()
+        years = np.where(np.isnan(years), -1, years).astype(np.int64)
+
+        return Completeness_Ranker._completeness_from_codes(
+            indicator_codes, country_codes, years, countries, indicator_dict, start_year, end_year
+        )
+
+    @staticmethod
+    def _completeness_from_codes(indicator_codes, country_codes, years, countries, indicator_dict,
+                                 start_year, end_year):
+        """
+        compute_completeness on integer-encoded data points: indicator positions in
+        indicator_dict, country positions in `countries` and years (negative codes are skipped).
+        """
+        n_years = end_year - start_year + 1
+        n_indicators = len(indicator_dict)
+        year_codes = np.asarray(years, dtype=np.int64) - start_year
 
-            # Convert to dataframe
-            df = pd.DataFrame(all_data, columns=['indicator', 'country', 'date', 'value'])
+        counts = np.bincount(indicator_codes[indicator_codes >= 0], minlength=n_indicators)
+        total_possible = len(countries) * n_years
+        summary = pd.DataFrame({
+            "Indicator Code": list(indicator_dict.keys()),
+            "Indicator Name": list(indicator_dict.values()),
+            "Completeness": counts / total_possible if total_possible > 0 else np.zeros(n_indicators),
+            "Data Points": counts,
+        })
 
-            print(f"Retrieved {len(df)} data points")
+        counts = np.bincount(country_codes[country_codes >= 0], minlength=len(countries))
+        by_country = pd.DataFrame({
+            "Country": countries,
+            "Completeness": counts / (n_indicators * n_years) if n_indicators else np.zeros(len(countries)),
+            "Data Points": counts,
+        })
 
-            # Calculate completeness for each indicator
-            results = []
-            total_possible = len(df['country'].unique()) * (end_year - start_year + 1)
+        in_range = (year_codes >= 0) & (year_codes < n_years)
+        counts = np.bincount(year_codes[in_range], minlength=n_years)
+        by_year = pd.DataFrame({
+            "Year": np.arange(start_year, end_year + 1),
+            "Completeness": counts / (n_indicators * len(countries)) if n_indicators and len(countries)
+            else np.zeros(n_years),
+            "Data Points": counts,
+        })
 
-            for code, name in tqdm.tqdm(indicator_dict.items(), desc="Calculating completeness"):
-                indicator_data = df[df['indicator'] == code]
-                count = len(indicator_data)
-                completeness = count / total_possible if total_possible > 0 else 0
-                results.append((code, name, completeness, count))
+        return summary, by_country, by_year
 
-            # Create and sort results
-            summary = pd.DataFrame(results, columns=["Indicator Code", "Indicator Name", "Completeness", "Data Points"])
-            top = summary.sort_values(by="Completeness", ascending=False)
+    @staticmethod
+    def rank_indicators_by_completeness(source=80, start_year=2000, end_year=2020, top_n=10,
+                                        cache_path=RESPONSE_CACHE_PATH, refresh=False,
+                                        retries=3, backoff=1.0, base_url=WB_API_URL,
+                                        max_workers=8, requests_per_second=None, return_data=True,
+                                        incremental=False):
+        """
+        Fetch all indicators from a source and rank them by data completeness.
+
+        Indicators are fetched concurrently by a pool of `max_workers` threads sharing one
+        connection pool; `requests_per_second` optionally caps the request rate across
+        all threads. max_workers=1 fetches one indicator at a time.
+
+        Fetched indicators are stored in a local SQLite response cache keyed by indicator
+        and year range, so a rerun (or a run resumed after an interruption) only fetches
+        the indicators that are missing. Failed requests are retried with exponential
+        backoff; indicators that still fail are reported and listed in
+        summary.attrs['failures'] as {code: error message}. The per-country and per-year
+        completeness breakdowns of compute_completeness are returned in
+        summary.attrs['by_country'] and summary.attrs['by_year'], also with return_data=False.
+
+        Args:
+            cache_path (str): SQLite cache file, None disables caching.
+            refresh (bool): Ignore cached responses and fetch everything again.
+            retries (int): Retries per request after the first attempt.
+            backoff (float): Base delay in seconds between retries.
+            base_url (str): World Bank API root, e.g. a local stand-in server.
+            max_workers (int): Number of indicators fetched at the same time.
+            requests_per_second (float): Maximum request rate, None for no limit.
+            incremental (bool): Only re-fetch cached indicators whose 'lastupdated' date on
+                the API moved since they were cached; the others are read from the cache and
+                the completeness table is recomputed over the merged data. The API dates data
+                per source, so the source's date is checked first with a single request, and
+                indicators are only checked one by one when it moved since the last complete run.
+            return_data (bool): Build and return the long data frame. With False only the
+                summary is computed and (top, None) is returned, so the raw data points are
+                never materialised as a frame.
+
+        Data points are accumulated in a Data_Point_Buffer as each indicator arrives; the
+        returned frame has categorical 'indicator', 'country' and 'date' columns.
+        """
+        session = Completeness_Ranker.make_session(max_workers)
+        rate_limiter = Rate_Limiter(requests_per_second) if requests_per_second else None
+        cache = Response_Cache(cache_path) if cache_path is not None else None
+
+        try:
+            # Get all indicators for the source
+            indicator_dict = Completeness_Ranker._get_source_indicators(
+                session, source, base_url, retries, backoff, rate_limiter
+            )
+            print(f"Found {len(indicator_dict)} indicators in source {source}")
 
-            return top, df
+            top, buffer = Completeness_Ranker._rank(
+                session, cache, indicator_dict, start_year, end_year, refresh,
+                base_url, retries, backoff, max_workers, rate_limiter, incremental,
+                {code: [source] for code in indicator_dict}
+            )
+            return top, buffer.to_frame() if return_data else None
 
         except Exception as e:
             print(f"Error fetching data: {e}")
             import traceback
             traceback.print_exc()
-            return None, None
\ No newline at end of file
+            return None, None
+
+        finally:
+            session.close()
+            if cache is not None:
+                cache.close()
+
+    @staticmethod
+    def rank_sources_by_completeness(sources=(80, 46, 87, 35, 14), start_year=2000, end_year=2020,
+                                     cache_path=RESPONSE_CACHE_PATH, refresh=False,
+                                     retries=3, backoff=1.0, base_url=WB_API_URL,
+                                     max_workers=8, requests_per_second=None, return_data=True,
+                                     incremental=False):
+        """
+        Rank the indicators of several sources by data completeness in one run.
+
+        The indicator lists of all sources are fetched concurrently over one shared
+        session, indicators that appear in more than one source are fetched only once,
+        and completeness is computed over the combined data, so every indicator is
+        measured against the same set of countries.
+
+        Takes the same options as rank_indicators_by_completeness.
+
+        Returns:
+            tuple: (ranked DataFrame with columns
+                    ["Indicator Code", "Indicator Name", "Sources", "Completeness", "Data Points"],
+                    where "Sources" lists the source ids containing the indicator,
+                    long data frame or None)
+
+            Sources whose indicator list cannot be fetched are skipped and listed in
+            attrs['source_failures'] as {source: error message}; the others are still ranked.
+            Indicator failures are in attrs['failures'] as for rank_indicators_by_completeness.
+        """
+        session = Completeness_Ranker.make_session(max_workers)
+        rate_limiter = Rate_Limiter(requests_per_second) if requests_per_second else None
+        cache = Response_Cache(cache_path) if cache_path is not None else None
+
+        try:
+            # Get the indicators of all sources at once, a source that fails is reported and skipped
+            source_indicators, source_failures = {}, {}
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = {
+                    executor.submit(Completeness_Ranker._get_source_indicators, session, source,
+                                    base_url, retries, backoff, rate_limiter): source
+                    for source in sources
+                }
+                for future in as_completed(futures):
+                    source = futures[future]
+                    try:
+                        source_indicators[source] = future.result()
+                    except (requests.RequestException, ValueError, RuntimeError) as e:
+                        source_failures[source] = str(e)
+
+            if source_failures:
+                print(f"Failed to fetch the indicator lists of {len(source_failures)} sources:")
+                for source, error in source_failures.items():
+                    print(f"  {source}: {error}")
+
+            # Deduplicate indicators shared between sources
+            indicator_dict, indicator_sources = {}, {}
+            for source in sources:
+                if source not in source_indicators:
+                    continue
+                indicators = source_indicators[source]
+                print(f"Found {len(indicators)} indicators in source {source}")
+                for code, name in indicators.items():
+                    indicator_dict.setdefault(code, name)
+                    indicator_sources.setdefault(code, []).append(source)
+            print(f"{len(indicator_dict)} unique indicators across {len(source_indicators)} sources")
+
+            top, buffer = Completeness_Ranker._rank(
+                session, cache, indicator_dict, start_year, end_year, refresh,
+                base_url, retries, backoff, max_workers, rate_limiter, incremental, indicator_sources
+            )
+            top.insert(2, "Sources", top["Indicator Code"].map(indicator_sources))
+            top.attrs['source_failures'] = {source: source_failures[source] for source in sources
+                                            if source in source_failures}
+            return top, buffer.to_frame() if return_data else None
+
+        except Exception as e:
+            print(f"Error fetching data: {e}")
+            import traceback
+            traceback.print_exc()
+            return None, None
+
+        finally:
+            session.close()
+            if cache is not None:
+                cache.close()
+
+    @staticmethod
+    def _get_source_indicators(session, source, base_url=WB_API_URL, retries=3, backoff=1.0, rate_limiter=None):
+        """
+        Returns {indicator code: name} for every indicator of a World Bank source.
+        """
+        indicators, _ = Completeness_Ranker._get_pages(
+            session, f"{base_url}/sources/{source}/indicators", {}, retries, backoff,
+            rate_limiter=rate_limiter
+        )
+        return {ind['id'].strip(): ind['name'] for ind in indicators}
+
+    @staticmethod
+    def _rank(session, cache, indicator_dict, start_year, end_year, refresh=False, base_url=WB_API_URL,
+              retries=3, backoff=1.0, max_workers=8, rate_limiter=None, incremental=False,
+              indicator_sources=None):
+        """
+        Fetch the indicators and rank them by completeness.
+
+        In incremental mode the 'lastupdated' date of every source in `indicator_sources`
+        ({code: [source ids]}) is compared with the one stored after the last complete run,
+        and only the indicators of sources whose date moved (or could not be checked) are
+        checked one by one.
+
+        Returns:
+            tuple: (summary sorted by completeness with attrs['failures'], attrs['by_country'] and
+                    attrs['by_year'] as returned by compute_completeness, Data_Point_Buffer)
+        """
+        print("Fetching data for all indicators...")
+
+        buffer = Data_Point_Buffer(indicator_dict.keys())
+
+        source_dates, probe = {}, None
+        if incremental and cache is not None and indicator_sources:
+            for source in sorted({s for sources in indicator_sources.values() for s in sources}, key=str):
+                try:
+                    source_dates[source] = Completeness_Ranker.get_source_last_updated(
+                        session, source, base_url, retries, backoff, rate_limiter
+                    )
+                except (requests.RequestException, ValueError, RuntimeError):
+                    source_dates[source] = None
+            changed = {source for source, date in source_dates.items()
+                       if date is None or date != cache.get_source(source, start_year, end_year)}
+            probe = {code for code, sources in indicator_sources.items() if changed.intersection(sources)}
+            if not changed:
+                print("Sources unchanged since the last run, using cached data")
+
+        failures, unchecked = Completeness_Ranker._fetch_all(
+            session, buffer.codes, start_year, end_year, buffer.add, cache, refresh,
+            base_url, retries, backoff, max_workers, rate_limiter, incremental, probe
+        )
+
+        # A source is only marked up to date once all of its indicators are cached and checked
+        if cache is not None:
+            for source, date in source_dates.items():
+                complete = not any(source in indicator_sources[code] for code in (*failures, *unchecked))
+                if date is not None and complete:
+                    cache.put_source(source, start_year, end_year, date)
+
+        if failures:
+            print(f"Failed to fetch {len(failures)} indicators:")
+            for code, error in failures.items():
+                print(f"  {code}: {error}")
+
+        print(f"Retrieved {len(buffer)} data points")
+
+        # Calculate completeness for every indicator in one pass over the buffered codes
+        indicator_codes, country_codes, years, _ = buffer.columns()
+        summary, by_country, by_year = Completeness_Ranker._completeness_from_codes(
+            indicator_codes, country_codes, years, buffer.countries, indicator_dict, start_year, end_year
+        )
+        top = summary.sort_values(by="Completeness", ascending=False)
+        top.attrs['failures'] = failures
+        top.attrs['by_country'] = by_country
+        top.attrs['by_year'] = by_year
+        return top, buffer
@@ -0,0 +1,195 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+
+# Pairs are processed in chunks so the per-pair statistics stay small for wide panels
+PAIR_CHUNK = 256
+
+
+class Correlation_Engine:
+    @staticmethod
+    def _column_means(values):
+        """
+        NaN-ignoring mean of every indicator (last axis), 0 for indicators with no value.
+        """
+        values = values.reshape(-1, values.shape[-1])
+        counts = np.count_nonzero(~np.isnan(values), axis=0)
+        return np.divide(np.nansum(values, axis=0), counts, out=np.zeros(values.shape[-1]), where=counts > 0)
+
+    @staticmethod
+    def _correlation(n, s_a, s_b, s_aa, s_bb, s_ab, min_periods=2):
+        """
+        Pearson correlation from the sufficient statistics of pairwise-complete observations.
+        NaN where fewer than `min_periods` observations or either side is constant.
+        """
+        cov = n * s_ab - s_a * s_b
+        var_a = n * s_aa - s_a ** 2
+        var_b = n * s_bb - s_b ** 2
+        # Variances within rounding of zero are constant series, which pandas reports as NaN
+        valid = (n >= min_periods) & (var_a > 1e-12 * n * s_aa) & (var_b > 1e-12 * n * s_bb)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            r = cov / np.sqrt(var_a * var_b)
+        return np.where(valid, np.clip(r, -1, 1), np.nan)
+
+    @staticmethod
+    def group_year_correlations(panel, pairs=None, groups=None, window=1, min_periods=2):
+        """
+        Correlations between indicator pairs across the countries of every (group, year) cell,
+        e.g. every continent and year as in the notebook's main_pairs loop.
+
+        Counts, sums, sums of squares and cross-products of pairwise-complete values are
+        accumulated for all cells in one grouped pass, so the cost does not grow with the
+        number of groups. With `window` > 1 a cell pools the `window` years ending at its
+        year, from cumulative sums of the same statistics; years without a full window are
+        left out.
+
+        Args:
+            panel (Panel): Panel to correlate.
+            pairs (list): (indicator, indicator) tuples, defaults to every pair of indicators.
+            groups (array-like): Group label per country, defaults to panel.continents.
+            window (int): Number of years pooled per cell.
+            min_periods (int): Minimum number of observations for a correlation.
+
+        Returns:
+            pd.DataFrame: Columns ['group', 'year', 'x', 'y', 'n', 'correlation'], one row per
+                group, year and pair.
+        """
+        if pairs is None:
+            pairs = list(itertools.combinations(panel.indicators, 2))
+        pairs = list(pairs)
+        missing = sorted({i for pair in pairs for i in pair} - set(panel.indicators))
+        if missing:
+            raise KeyError(f"Indicators {missing} not in panel.")
+        if window < 1 or window > len(panel.years):
+            raise ValueError(f"window must be between 1 and {len(panel.years)}, got {window}")
+
+        groups = panel.continents if groups is None else groups
+        labels, codes = np.unique(np.asarray(groups, dtype=object).astype(str), return_inverse=True)
+        membership = np.zeros((len(labels), len(codes)))
+        membership[codes, np.arange(len(codes))] = 1
+
+        # Correlation does not change under a shift; centering keeps the sums well conditioned
+        values = panel.values.astype(np.float64)
+        values -= Correlation_Engine._column_means(values)
+        valid = ~np.isnan(values)
+        values = np.where(valid, values, 0)
+
+        n_countries, n_years, _ = values.shape
+        ends = np.arange(window - 1, n_years)
+        a_all = np.array([panel.indicators.index(a) for a, _ in pairs], dtype=np.intp)
+        b_all = np.array([panel.indicators.index(b) for _, b in pairs], dtype=np.intp)
+
+        results = []
+        for start in range(0, len(pairs), PAIR_CHUNK):
+            a, b = a_all[start:start + PAIR_CHUNK], b_all[start:start + PAIR_CHUNK]
+            both = valid[:, :, a] & valid[:, :, b]
+            x, y = values[:, :, a] * both, values[:, :, b] * both
+
+            # (stat, country, year, pair) -> (stat, group, year, pair) with one matrix product
+            stats = np.stack([both, x, y, x * x, y * y, x * y]).astype(np.float64)
+            stats = membership @ stats.reshape(6, n_countries, -1)
+            stats = stats.reshape(6, len(labels), n_years, len(a))
+
+            if window > 1:
+                cumulative = np.cumsum(stats, axis=2)
+                stats = cumulative[:, :, ends]
+                stats[:, :, 1:] -= cumulative[:, :, ends[1:] - window]
+
+            results.append((stats[0], Correlation_Engine._correlation(*stats, min_periods=min_periods)))
+
+        n = np.concatenate([r[0] for r in results], axis=-1)
+        r = np.concatenate([r[1] for r in results], axis=-1)
+        n_groups, n_cells, n_pairs = r.shape
+        return pd.DataFrame({
+            'group': np.repeat(labels, n_cells * n_pairs),
+            'year': np.tile(np.repeat(panel.years[ends], n_pairs), n_groups),
+            'x': np.tile([p[0] for p in pairs], n_groups * n_cells),
+            'y': np.tile([p[1] for p in pairs], n_groups * n_cells),
+            'n': n.ravel().astype(np.int64),
+            'correlation': r.ravel(),
+        })
+
+    @staticmethod
+    def threshold_pairs(corr, threshold=0.6):
+        """
+        Returns the indicator pairs of a correlation matrix with |r| > threshold, each pair once.
+
+        Replaces the nested column loop over the matrix with one upper-triangle mask.
+
+        Args:
+            corr (pd.DataFrame): Square correlation matrix, e.g. data.corr() or
+                Correlation_Accumulator.matrix().
+            threshold (float): Absolute correlation a pair must exceed.
+
+        Returns:
+            pd.DataFrame: Columns ['x', 'y', 'correlation'] in matrix order, x before y.
+        """
+        values = corr.to_numpy()
+        upper = np.triu(np.ones(values.shape, dtype=bool), k=1)
+        rows, cols = np.nonzero(upper & (np.abs(np.nan_to_num(values)) > threshold))
+        return pd.DataFrame({
+            'x': corr.index[rows],
+            'y': corr.columns[cols],
+            'correlation': values[rows, cols],
+        })
+
+
+class Correlation_Accumulator:
+    """
+    Pairwise-complete Pearson correlation matrix kept as running sufficient statistics.
+
+    For every indicator pair the accumulator holds the number of rows where both are present
+    and the sums, sums of squares and cross-products over those rows, so adding new years or
+    countries updates the matrix without revisiting earlier rows. matrix() matches
+    DataFrame.corr() over all rows added so far.
+    """
+
+    def __init__(self, indicators):
+        self.indicators = list(indicators)
+        n = len(self.indicators)
+        self.shift = None
+        self.n = np.zeros((n, n))
+        self.s_a = np.zeros((n, n))  # s_a[i, j]: sum of indicator i over rows where j is present too
+        self.s_aa = np.zeros((n, n))
+        self.s_ab = np.zeros((n, n))
+
+    def add(self, values):
+        """
+        Adds observations: a DataFrame with the accumulator's indicator columns, or an array
+        whose last axis follows `indicators` (e.g. a panel's (country, year, indicator) cube).
+        """
+        if isinstance(values, pd.DataFrame):
+            values = values[self.indicators].to_numpy(dtype=np.float64)
+        values = np.asarray(values, dtype=np.float64).reshape(-1, len(self.indicators))
+
+        # Correlations do not change under a shift; centering on the first batch keeps the
+        # sums well conditioned as more rows arrive
+        if self.shift is None:
+            self.shift = Correlation_Engine._column_means(values)
+        valid = ~np.isnan(values)
+        x = np.where(valid, values - self.shift, 0)
+        v = valid.astype(np.float64)
+
+        self.n += v.T @ v
+        self.s_a += x.T @ v
+        self.s_aa += (x * x).T @ v
+        self.s_ab += x.T @ x
+        return self
+
+    def add_panel(self, panel):
+        """
+        Adds every country-year row of a panel, matching indicators by name.
+        """
+        positions = [panel.indicators.index(i) for i in self.indicators]
+        return self.add(panel.values[:, :, positions])
+
+    def matrix(self, min_periods=1):
+        """
+        Returns the correlation matrix of every row added so far as a DataFrame.
+        """
+        r = Correlation_Engine._correlation(self.n, self.s_a, self.s_a.T, self.s_aa, self.s_aa.T, self.s_ab,
+                                            min_periods=max(min_periods, 2))
+        diagonal = np.diag_indices_from(r)
+        r[diagonal] = np.where(np.isnan(r[diagonal]), np.nan, 1.0)
+        return pd.DataFrame(r, index=self.indicators, columns=self.indicators)
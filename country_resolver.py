@@ -0,0 +1,239 @@
+import json
+import os
+import re
+import unicodedata
+import importlib.metadata
+
+import numpy as np
+import pandas as pd
+import pycountry
+
+try:
+    import pycountry_convert
+except ImportError:  # continents then only come from CONTINENT_OVERRIDES
+    pycountry_convert = None
+
+# Anchored to this folder so lookups do not depend on the caller's working directory
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+COUNTRY_MAPPING_FILE = os.path.join(PACKAGE_DIR, 'country_names_mapping.json')
+COUNTRY_INDEX_CACHE = os.path.join(PACKAGE_DIR, '.country_index.json')
+# Bump when the built-in aliases or countries below change, to invalidate cached indexes
+COUNTRY_INDEX_VERSION = 2
+
+# Names pycountry does not know: canonical names used in country_names_mapping.json
+# and spellings found in the HDI, EPI and World Bank files
+EXTRA_ALIASES = {
+    "Republic Of The Congo": "COG",
+    "Democratic Republic Of The Congo": "COD",
+    "East Timor": "TLS",
+    "Macao SAR, China": "MAC",
+    "Faeroe Islands": "FRO",
+    "Falkland Islands": "FLK",
+    "Holy See": "VAT",
+    "Sint Maarten": "SXM",
+    "State of Palestine": "PSE",
+    "West Bank and Gaza": "PSE",
+    "Wallis and Futuna Islands": "WLF",
+    "Somalia, Fed. Rep.": "SOM",
+}
+
+# Countries missing from pycountry, with the codes the data sources use for them
+EXTRA_COUNTRIES = {
+    "XKX": {"country": "Kosovo", "continent": "Europe"},
+}
+
+# Countries pycountry_convert has no continent for
+CONTINENT_OVERRIDES = {
+    "COD": "Africa",
+    "MAC": "Asia",
+    "SXM": "North America",
+    "ESH": "Africa",
+    "TLS": "Asia",
+    "VAT": "Europe",
+}
+
+
+class Country_Resolver:
+    _index = None
+    _index_args = None
+    _key_dtype = None
+
+    @staticmethod
+    def normalize(name):
+        """
+        Normalises a country name for lookups: accents removed, case folded and
+        punctuation collapsed, e.g. "Côte D'Ivoire" -> "cote d ivoire". A leading
+        "St." is spelled out, as in "St. Lucia" -> "saint lucia".
+        """
+        name = unicodedata.normalize('NFKD', str(name))
+        name = ''.join(ch for ch in name if not unicodedata.combining(ch))
+        name = re.sub(r'[^a-z0-9]+', ' ', name.casefold()).strip()
+        return re.sub(r'^st ', 'saint ', name)
+
+    @staticmethod
+    def _continent(alpha_2, alpha_3):
+        if alpha_3 in CONTINENT_OVERRIDES:
+            return CONTINENT_OVERRIDES[alpha_3]
+        if pycountry_convert is None:
+            return None
+        try:
+            code = pycountry_convert.country_alpha2_to_continent_code(alpha_2)
+            return pycountry_convert.convert_continent_code_to_continent_name(code)
+        except KeyError:
+            return None
+
+    @staticmethod
+    def build_index(mapping_path=COUNTRY_MAPPING_FILE):
+        """
+        Builds the lookup index from pycountry names, official names, common names and
+        ISO3 codes, plus the manual corrections in the mapping file. Raises FileNotFoundError
+        when the mapping file does not exist; pass mapping_path=None to build without it.
+
+        Returns:
+            dict: {'names': {normalised name: iso3},
+                   'countries': {iso3: {'country': canonical name, 'continent': continent}}}
+        """
+        names, countries = {}, {}
+        for c in pycountry.countries:
+            countries[c.alpha_3] = {
+                'country': c.name,
+                'continent': Country_Resolver._continent(c.alpha_2, c.alpha_3),
+            }
+            for alias in (c.alpha_3, c.name, getattr(c, 'official_name', None), getattr(c, 'common_name', None)):
+                if alias:
+                    names.setdefault(Country_Resolver.normalize(alias), c.alpha_3)
+
+        for iso3, info in EXTRA_COUNTRIES.items():
+            countries[iso3] = dict(info)
+            names[Country_Resolver.normalize(iso3)] = iso3
+            names[Country_Resolver.normalize(info['country'])] = iso3
+
+        for alias, iso3 in EXTRA_ALIASES.items():
+            names[Country_Resolver.normalize(alias)] = iso3
+
+        # Manual corrections map a raw name to a canonical name, which also becomes the display name
+        mapping = {}
+        if mapping_path is not None:
+            if not os.path.exists(mapping_path):
+                raise FileNotFoundError(f"Country name mapping {mapping_path} not found.")
+            with open(mapping_path, 'r', encoding='utf-8') as f:
+                mapping = json.load(f)
+        for raw, canonical in mapping.items():
+            iso3 = names.get(Country_Resolver.normalize(canonical))
+            if iso3 is None:
+                continue
+            names[Country_Resolver.normalize(raw)] = iso3
+            countries[iso3]['country'] = canonical
+
+        return {'names': names, 'countries': countries}
+
+    @staticmethod
+    def load_index(mapping_path=COUNTRY_MAPPING_FILE, cache_path=COUNTRY_INDEX_CACHE):
+        """
+        Returns the lookup index, built once per process and cached on disk.
+
+        The disk cache is keyed by COUNTRY_INDEX_VERSION, the pycountry version and the
+        mapping file's modification time and size, and rebuilt when any of them changes.
+        The key is only checked the first time an index is asked for with these paths;
+        later calls in the same process reuse it.
+        """
+        args = (mapping_path, cache_path)
+        if Country_Resolver._index is not None and Country_Resolver._index_args == args:
+            return Country_Resolver._index
+
+        key = [COUNTRY_INDEX_VERSION, importlib.metadata.version('pycountry'), pycountry_convert is not None]
+        if mapping_path is not None and os.path.exists(mapping_path):
+            stat = os.stat(mapping_path)
+            key += [os.path.abspath(mapping_path), stat.st_mtime_ns, stat.st_size]
+
+        index = None
+        if cache_path is not None and os.path.exists(cache_path):
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            if cached.get('key') == key:
+                index = cached['index']
+
+        if index is None:
+            index = Country_Resolver.build_index(mapping_path)
+            if cache_path is not None:
+                with open(cache_path, 'w', encoding='utf-8') as f:
+                    json.dump({'key': key, 'index': index}, f)
+
+        Country_Resolver._index, Country_Resolver._index_args = index, args
+        # Sorted once here rather than on every country_key call
+        Country_Resolver._key_dtype = pd.CategoricalDtype(sorted(index['countries']))
+        return index
+
+    @staticmethod
+    def resolve(names, mapping_path=COUNTRY_MAPPING_FILE, cache_path=COUNTRY_INDEX_CACHE):
+        """
+        Resolves a column of free-text country names.
+
+        Each distinct name is looked up once and the result is broadcast back to the
+        column. Names that are not countries (regions, income groups, ...) resolve to NaN.
+
+        Args:
+            names (pd.Series | list): Country names.
+
+        Returns:
+            pd.DataFrame: Columns ['iso3', 'country', 'continent'], aligned with `names`.
+        """
+        names = pd.Series(names)
+        index = Country_Resolver.load_index(mapping_path, cache_path)
+        lookup, countries = index['names'], index['countries']
+
+        codes, uniques = pd.factorize(names)
+        iso3 = [lookup.get(Country_Resolver.normalize(name)) for name in uniques]
+        unique_df = pd.DataFrame({
+            'iso3': iso3,
+            'country': [countries[i]['country'] if i else None for i in iso3],
+            'continent': [countries[i]['continent'] if i else None for i in iso3],
+        })
+
+        # Missing names have code -1, which picks the all-NaN row appended at the end
+        unique_df.loc[len(unique_df)] = [None, None, None]
+        resolved = unique_df.iloc[codes].reset_index(drop=True)
+        resolved.index = names.index
+        return resolved
+
+    @staticmethod
+    def get_continent(names, mapping_path=COUNTRY_MAPPING_FILE, cache_path=COUNTRY_INDEX_CACHE):
+        """
+        Returns the continent of every country name, 'Unknown' when it cannot be resolved.
+        """
+        continent = Country_Resolver.resolve(names, mapping_path, cache_path)['continent']
+        return continent.fillna('Unknown')
+
+    @staticmethod
+    def iso3_categories(mapping_path=COUNTRY_MAPPING_FILE, cache_path=COUNTRY_INDEX_CACHE):
+        """
+        Returns the sorted ISO3 codes of every known country (a pd.Index), the shared
+        category order behind country_key.
+        """
+        Country_Resolver.load_index(mapping_path, cache_path)
+        return Country_Resolver._key_dtype.categories
+
+    @staticmethod
+    def country_key(iso3, mapping_path=COUNTRY_MAPPING_FILE, cache_path=COUNTRY_INDEX_CACHE):
+        """
+        Encodes ISO3 codes as a categorical over iso3_categories, so every loader
+        produces the same integer codes for the same country. Codes that are not
+        countries (e.g. HDI regional aggregates) become NaN.
+        """
+        categories = Country_Resolver.iso3_categories(mapping_path, cache_path)
+        # Codes are looked up directly, since pandas deprecates building a categorical from
+        # values outside its categories (Pandas4Warning); those get code -1 (NaN)
+        codes = categories.get_indexer(np.asarray(iso3, dtype=object))
+        return pd.Categorical.from_codes(codes, dtype=Country_Resolver._key_dtype)
+
+    @staticmethod
+    def key_names(country_key, mapping_path=COUNTRY_MAPPING_FILE, cache_path=COUNTRY_INDEX_CACHE):
+        """
+        Returns the canonical country name of every country_key value.
+        """
+        countries = Country_Resolver.load_index(mapping_path, cache_path)['countries']
+        country_key = pd.Categorical(country_key)
+
+        # Missing keys have code -1, which picks the NaN appended at the end
+        names = np.array([countries[iso3]['country'] for iso3 in country_key.categories] + [np.nan], dtype=object)
+        return pd.Series(names[country_key.codes])
@@ -1,7 +1,25 @@
+import numpy as np
 import pandas as pd
 import wbdata
 import datetime
+import glob
+import hashlib
+import json
 import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import reduce
+
+from country_resolver import Country_Resolver
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # without pyarrow the HDI table is always parsed from CSV
+    pq = None
+
+HDI_ID_COLUMNS = ['iso3', 'country', 'region']
+HDI_CACHE_DIR = '.hdi_cache'
+EPI_STORE_DIR = '.epi_store'
+EPI_VARIABLES_FILE = 'epi2024variables2024-12-11.csv'
 
 
 class Data_Handler:
@@ -10,33 +28,139 @@ class Data_Handler:
         """
         Converts wide-format year columns into long format for easier filtering.
         """
-        id_vars = ['iso3', 'country', 'region']
+        id_vars = HDI_ID_COLUMNS
 
         # Determine columns that match indicator prefixes
-        value_vars = [
-            col for col in df.columns
-            if any(col.startswith(prefix + "_") for prefix in indicators.keys())
-        ]
+        value_vars = Data_Handler._match_HDI_columns(df.columns, indicators)
 
-        long_df = df.melt(
-            id_vars=id_vars,
-            value_vars=value_vars,
-            var_name='metric_year',
-            value_name='value'
-        )
+        # Split each '<metric>_<year>' column name once, instead of once per melted row
+        split = [col.rsplit('_', 1) for col in value_vars]
+        metric = pd.Categorical([m for m, _ in split])
+        metric_name = pd.Categorical([indicators.get(m) for m, _ in split])
+        year = np.array([int(y) for _, y in split], dtype=np.int64)
 
-        # Split 'metric_year' into 'metric' and 'year'
-        long_df[['metric', 'year']] = long_df['metric_year'].str.rsplit('_', n=1, expand=True)
-        long_df['year'] = long_df['year'].astype(int)
-        long_df.drop(columns='metric_year', inplace=True)
+        # Melt by hand: id columns are tiled and per-column metadata repeated for every row
+        n_rows = len(df)
+        long_df = pd.DataFrame({col: np.tile(df[col].to_numpy(), len(value_vars)) for col in id_vars})
+        long_df['value'] = df[value_vars].to_numpy().ravel(order='F')
+        long_df['metric'] = pd.Categorical.from_codes(np.repeat(metric.codes, n_rows), metric.categories)
+        long_df['year'] = np.repeat(year, n_rows)
 
         # Add readable metric names
-        long_df['metric_name'] = long_df['metric'].map(indicators)
+        long_df['metric_name'] = pd.Categorical.from_codes(
+            np.repeat(metric_name.codes, n_rows), metric_name.categories
+        )
+
+        # Shared integer country key, encoded once per wide row
+        long_df['country_key'] = Data_Handler._tile_key(Country_Resolver.country_key(df['iso3']), len(value_vars))
 
         return long_df
 
     @staticmethod
-    def get_data_HDI(filepath: str, indicators: dict, countries=None, start_year=None, end_year=None):
+    def _tile_key(country_key, n):
+        """
+        Repeats a country_key categorical n times, the way the id columns are tiled when melting.
+        """
+        return pd.Categorical.from_codes(np.tile(country_key.codes, n), country_key.categories)
+
+    @staticmethod
+    def _match_HDI_columns(columns, indicators: dict, start_year=None, end_year=None):
+        """
+        Returns the '<metric>_<year>' columns that belong to one of the indicator prefixes
+        and, when a year range is given, whose year suffix falls inside it.
+        """
+        return [
+            col for col in columns
+            if any(col.startswith(prefix + "_") for prefix in indicators.keys())
+            and Data_Handler._year_in_range(int(col.rsplit('_', 1)[-1]), start_year, end_year)
+        ]
+
+    @staticmethod
+    def _year_in_range(year: int, start_year=None, end_year=None):
+        """
+        Checks a year against an optional inclusive range.
+        """
+        return (start_year is None or year >= start_year) and (end_year is None or year <= end_year)
+
+    @staticmethod
+    def _country_mask(names, countries):
+        """
+        Returns a boolean array marking the names that match the requested countries
+        (case-insensitive), or None when no country filter is requested.
+        """
+        if countries is None:
+            return None
+        if isinstance(countries, str):
+            countries = [countries]
+        return pd.Series(names).str.lower().isin([c.lower() for c in countries]).to_numpy()
+
+    @staticmethod
+    def _standardize_columns(columns):
+        """
+        Strips, lower-cases and snake-cases column names.
+        """
+        return columns.str.strip().str.lower().str.replace(' ', '_')
+
+    @staticmethod
+    def _read_HDI_csv(filepath: str, indicators: dict = None, start_year=None, end_year=None):
+        """
+        Parses the HDI CSV and standardizes its column names.
+
+        When indicators are given, the header is scanned first and only the id columns
+        and the columns matching the indicator prefixes and year range are parsed.
+        """
+        usecols = None
+        if indicators is not None:
+            header = pd.read_csv(filepath, encoding="ISO-8859-1", nrows=0).columns
+            standardized = Data_Handler._standardize_columns(header)
+            value_vars = Data_Handler._match_HDI_columns(standardized, indicators, start_year, end_year)
+            wanted = set(HDI_ID_COLUMNS + value_vars)
+            usecols = [raw for raw, col in zip(header, standardized) if col in wanted]
+
+        df = pd.read_csv(filepath, encoding="ISO-8859-1", usecols=usecols)
+        df.columns = Data_Handler._standardize_columns(df.columns)
+        return df
+
+    @staticmethod
+    def _HDI_cache_path(filepath: str, cache_dir: str):
+        """
+        Returns the Parquet cache path for a CSV, keyed by its absolute path, mtime and size.
+        """
+        stat = os.stat(filepath)
+        key = f"{os.path.abspath(filepath)}|{stat.st_mtime_ns}|{stat.st_size}"
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+        name = os.path.splitext(os.path.basename(filepath))[0]
+        return os.path.join(cache_dir, f"{name}-{digest}.parquet")
+
+    @staticmethod
+    def _read_HDI_cached(filepath: str, indicators: dict, cache_dir: str, start_year=None, end_year=None):
+        """
+        Loads the id columns and the requested indicator/year columns from the Parquet cache,
+        (re)building the cache from the CSV first if it is missing or stale.
+        """
+        cache_path = Data_Handler._HDI_cache_path(filepath, cache_dir)
+
+        if not os.path.exists(cache_path):
+            df = Data_Handler._read_HDI_csv(filepath)
+            os.makedirs(cache_dir, exist_ok=True)
+
+            # Remove caches built from earlier versions of the same file
+            name = os.path.splitext(os.path.basename(filepath))[0]
+            for stale in glob.glob(os.path.join(cache_dir, f"{name}-*.parquet")):
+                os.remove(stale)
+
+            # Write to a temporary file first so readers never see a partial cache
+            tmp_path = cache_path + ".tmp"
+            df.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, cache_path)
+
+        columns = pq.ParquetFile(cache_path).schema_arrow.names
+        value_vars = Data_Handler._match_HDI_columns(columns, indicators, start_year, end_year)
+        return pd.read_parquet(cache_path, columns=HDI_ID_COLUMNS + value_vars)
+
+    @staticmethod
+    def get_data_HDI(filepath: str, indicators: dict, countries=None, start_year=None, end_year=None,
+                     use_cache=True, cache_dir=None):
         """
         Retrieve filtered data based on an indicator dictionary, countries, and year range.
 
@@ -45,51 +169,277 @@ class Data_Handler:
             countries (list or str): Country or list of countries to filter by.
             start_year (int): Start year for filtering.
             end_year (int): End year for filtering.
+            use_cache (bool): Read from a columnar Parquet cache of the CSV, keyed by the file's
+                path, modification time and size. The cache is rebuilt when the CSV changes and
+                is skipped when pyarrow is not installed.
+            cache_dir (str): Cache folder, defaults to '.hdi_cache' next to the CSV.
             :param filepath: path of the HDI dataset
         """
-        # Read CSV safely
-        df = pd.read_csv(filepath, encoding="ISO-8859-1")
+        if use_cache and pq is not None:
+            if cache_dir is None:
+                cache_dir = os.path.join(os.path.dirname(os.path.abspath(filepath)), HDI_CACHE_DIR)
+            df = Data_Handler._read_HDI_cached(filepath, indicators, cache_dir, start_year, end_year)
+        else:
+            df = Data_Handler._read_HDI_csv(filepath, indicators, start_year, end_year)
+
+        # Filter by countries on the wide table, the year range is already applied to its columns
+        mask = Data_Handler._country_mask(df['country'], countries)
+        if mask is not None:
+            df = df[mask]
 
-        # Standardize column names
-        df.columns = (
-            df.columns
-            .str.strip()
-            .str.lower()
-            .str.replace(' ', '_')
-        )
         # Convert to long format using the indicators provided
         long_df = Data_Handler.reshape_long_HDI(df, indicators)
 
-        # Filter by countries
-        if countries is not None:
-            if isinstance(countries, str):
-                countries = [countries]
-            long_df = long_df[long_df['country'].str.lower().isin([c.lower() for c in countries])]
+        return long_df.reset_index(drop=True)
 
-        # Filter by year range
-        if start_year is not None:
-            long_df = long_df[long_df['year'] >= start_year]
-        if end_year is not None:
-            long_df = long_df[long_df['year'] <= end_year]
+    @staticmethod
+    def _read_EPI_file(var: str, folder_path: str):
+        """
+        Reads one '<VAR>_ind_na.csv' file in wide format.
 
-        return long_df.reset_index(drop=True)
+        Returns:
+            tuple: (DataFrame, list of year column names, int64 array of their years)
+        """
+        filename = os.path.join(folder_path, f"{var}_ind_na.csv")
+        if not os.path.exists(filename):
+            raise FileNotFoundError(f"File {filename} not found.")
+
+        # Load CSV safely
+        df = pd.read_csv(filename)
+
+        # Standardize columns
+        df.columns = Data_Handler._standardize_columns(df.columns)
+
+        # Identify year columns for this variable (e.g., bca.ind.1990), reading each year once
+        year_cols = [col for col in df.columns if col.startswith(var.lower() + '.ind.')]
+        years = np.array([int(col.rsplit('.', 1)[-1]) for col in year_cols], dtype=np.int64)
+        return df, year_cols, years
+
+    @staticmethod
+    def _load_EPI_file(var: str, var_name: str, folder_path: str, countries=None, start_year=None, end_year=None):
+        """
+        Reads one '<VAR>_ind_na.csv' file, filters it and melts it into long format.
+        """
+        df, year_cols, years = Data_Handler._read_EPI_file(var, folder_path)
+
+        # Filter rows by country and columns by year before melting
+        mask = Data_Handler._country_mask(df['country'], countries)
+        if mask is not None:
+            df = df[mask]
+        keep = [Data_Handler._year_in_range(year, start_year, end_year) for year in years]
+        year_cols = [col for col, k in zip(year_cols, keep) if k]
+        years = years[np.array(keep, dtype=bool)]
+
+        # Melt wide -> long
+        n_rows = len(df)
+        long_df = pd.DataFrame({col: np.tile(df[col].to_numpy(), len(year_cols)) for col in ['iso', 'country']})
+        long_df['value'] = df[year_cols].to_numpy(dtype=float).ravel(order='F')
+        long_df['year'] = np.repeat(years, n_rows)
+
+        # Add metadata
+        long_df['variable'] = var
+        long_df['variable_name'] = var_name
+        long_df['country_key'] = Data_Handler._tile_key(Country_Resolver.country_key(df['iso']), len(year_cols))
+        return long_df
 
     @staticmethod
-    def get_data_EPI(indicators: dict, countries=None, start_year=None, end_year=None, folder_path='P5_Indicator'):
+    def compile_EPI_store(folder_path='P5_Indicator', store_path=EPI_STORE_DIR, indicators: dict = None,
+                          max_workers=None):
+        """
+        Packs the EPI indicator files into a single memory-mappable store.
+
+        The store folder holds 'values.npy', a float32 array shaped (indicator, country, year)
+        with NaN for missing values, and 'index.json' with the indicator, country, ISO and
+        year tables plus the modification time and size of every source file. Read it back
+        with load_EPI_store or get_data_EPI(store_path=...).
+
+        Args:
+            folder_path (str): Path to the folder containing the CSV files.
+            store_path (str): Folder to write the store to.
+            indicators (dict): Indicators to pack, defaults to every file in the folder.
+            max_workers (int): Number of threads reading files concurrently.
+
+        Returns:
+            str: The store path.
+        """
+        if indicators is None:
+            indicators = Data_Handler.get_EPI_indicators(folder_path)
+
+        # Versions of the source files, checked by load_EPI_store
+        sources = Data_Handler._EPI_sources(indicators, folder_path)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            frames = list(executor.map(lambda var: Data_Handler._read_EPI_file(var, folder_path), indicators))
+
+        # Shared country and year axes over all files
+        countries = pd.concat([df[['iso', 'country']] for df, _, _ in frames]).drop_duplicates('iso')
+        years = sorted({int(year) for _, _, file_years in frames for year in file_years})
+        country_index = pd.Index(countries['iso'])
+        year_index = pd.Index(years)
+
+        values = np.full((len(frames), len(countries), len(years)), np.nan, dtype=np.float32)
+        for i, (df, year_cols, file_years) in enumerate(frames):
+            rows = country_index.get_indexer(df['iso'])
+            cols = year_index.get_indexer(file_years)
+            values[i][np.ix_(rows, cols)] = df[year_cols].to_numpy(dtype=np.float32)
+
+        index = {
+            'variables': list(indicators.keys()),
+            'variable_names': list(indicators.values()),
+            'iso': countries['iso'].tolist(),
+            'country': countries['country'].tolist(),
+            'years': years,
+            'folder_path': os.path.abspath(folder_path),
+            'sources': sources,
+        }
+
+        # Write to temporary files and swap them in, so arrays already mapped from the old
+        # store keep reading it and a crash never leaves values that do not match the index.
+        # The index goes last, so until it is swapped in the store still records the old sources.
+        os.makedirs(store_path, exist_ok=True)
+        values_path = os.path.join(store_path, 'values.npy')
+        index_path = os.path.join(store_path, 'index.json')
+        with open(values_path + ".tmp", 'wb') as f:
+            np.save(f, values)
+        with open(index_path + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump(index, f)
+        os.replace(values_path + ".tmp", values_path)
+        os.replace(index_path + ".tmp", index_path)
+
+        return store_path
+
+    @staticmethod
+    def _EPI_sources(indicators, folder_path):
+        """
+        Returns {variable: [mtime_ns, size]} of the '<VAR>_ind_na.csv' files behind a store.
+        Files that do not exist are left out.
+        """
+        sources = {}
+        for var in indicators:
+            filename = os.path.join(folder_path, f"{var}_ind_na.csv")
+            if os.path.exists(filename):
+                stat = os.stat(filename)
+                sources[var] = [stat.st_mtime_ns, stat.st_size]
+        return sources
+
+    @staticmethod
+    def load_EPI_store(store_path=EPI_STORE_DIR, rebuild=True):
+        """
+        Opens a store written by compile_EPI_store without reading it into memory.
+
+        The modification time and size of every source CSV recorded in the store are checked
+        first, like the HDI cache. When a file changed (or the store predates this check) the
+        store is rebuilt from its folder, or a RuntimeError is raised if `rebuild` is False.
+
+        Returns:
+            tuple: (read-only memory-mapped float32 array shaped (indicator, country, year),
+                    dict with 'variables', 'variable_names', 'iso', 'country' and 'years' lists)
+        """
+        with open(os.path.join(store_path, 'index.json'), encoding='utf-8') as f:
+            index = json.load(f)
+
+        folder_path = index.get('folder_path')
+        current = Data_Handler._EPI_sources(index['variables'], folder_path) if folder_path else None
+        if current is None or current != index.get('sources'):
+            if not rebuild or folder_path is None or not os.path.isdir(folder_path):
+                raise RuntimeError(f"EPI store {store_path} is out of date with its source files, "
+                                   f"rebuild it with compile_EPI_store.")
+            Data_Handler.compile_EPI_store(folder_path, store_path,
+                                           dict(zip(index['variables'], index['variable_names'])))
+            with open(os.path.join(store_path, 'index.json'), encoding='utf-8') as f:
+                index = json.load(f)
+
+        values = np.load(os.path.join(store_path, 'values.npy'), mmap_mode='r')
+        return values, index
+
+    @staticmethod
+    def _get_data_EPI_store(indicators: dict, countries, start_year, end_year, store_path: str):
+        """
+        Slices the requested indicators, countries and years out of an EPI store and
+        returns them in the same long format as the CSV loader.
+        """
+        values, index = Data_Handler.load_EPI_store(store_path)
+
+        if indicators is None:
+            indicators = dict(zip(index['variables'], index['variable_names']))
+        positions = {var: i for i, var in enumerate(index['variables'])}
+        missing = [var for var in indicators if var not in positions]
+        if missing:
+            raise KeyError(f"Indicators {missing} not found in EPI store {store_path}.")
+
+        iso = np.array(index['iso'], dtype=object)
+        country = np.array(index['country'], dtype=object)
+        years = np.array(index['years'], dtype=np.int64)
+
+        # Select the slice on the index tables before touching the values
+        ind_idx = [positions[var] for var in indicators]
+        mask = Data_Handler._country_mask(country, countries)
+        country_idx = np.arange(len(country)) if mask is None else np.flatnonzero(mask)
+        year_idx = np.flatnonzero([Data_Handler._year_in_range(year, start_year, end_year) for year in years])
+
+        # (indicator, country, year) -> rows ordered by indicator, year, country
+        cube = values[np.ix_(ind_idx, country_idx, year_idx)]
+        n_ind, n_countries, n_years = cube.shape
+        return pd.DataFrame({
+            'iso': np.tile(iso[country_idx], n_ind * n_years),
+            'country': np.tile(country[country_idx], n_ind * n_years),
+            'value': cube.transpose(0, 2, 1).ravel(),
+            'year': np.tile(np.repeat(years[year_idx], n_countries), n_ind),
+            'variable': np.repeat(list(indicators.keys()), n_years * n_countries),
+            'variable_name': np.repeat(list(indicators.values()), n_years * n_countries),
+            'country_key': Data_Handler._tile_key(Country_Resolver.country_key(iso[country_idx]), n_ind * n_years),
+        })
+
+    @staticmethod
+    def get_EPI_indicators(folder_path='P5_Indicator', variables_path=EPI_VARIABLES_FILE):
+        """
+        Lists every indicator available in the EPI folder.
+
+        Args:
+            folder_path (str): Path to the folder containing the '<VAR>_ind_na.csv' files.
+            variables_path (str): EPI variables file used to look up readable names.
+                Indicators missing from it (or all of them, if the file does not exist)
+                are named by their abbreviation.
+
+        Returns:
+            dict: Mapping from variable abbreviation to readable name, sorted by abbreviation.
+        """
+        names = {}
+        if variables_path is not None and os.path.exists(variables_path):
+            variables = pd.read_csv(variables_path)
+            names = dict(zip(variables['Abbreviation'], variables['Variable']))
+
+        suffix = '_ind_na.csv'
+        abbreviations = sorted(
+            os.path.basename(f)[:-len(suffix)]
+            for f in glob.glob(os.path.join(folder_path, '*' + suffix))
+        )
+        return {var: names.get(var, var) for var in abbreviations}
+
+    @staticmethod
+    def get_data_EPI(indicators: dict = None, countries=None, start_year=None, end_year=None,
+                     folder_path='P5_Indicator', max_workers=None, store_path=None):
         """
         Load environmental/social indicators from CSV files and filter by country/year.
 
         Parameters
         ----------
-        indicators : dict
+        indicators : dict | None
             Dictionary mapping variable abbreviations to readable names, e.g.:
             {"BCA": "Biodiversity Conservation Area", "BER": "Biodiversity Expenditure Ratio"}.
+            If None, every indicator in the folder is loaded (see get_EPI_indicators).
         countries : str | list[str] | None
             Country or list of countries to filter.
         start_year (int): Start year for filtering.
         end_year (int): End year for filtering.
         folder_path : str
             Path to the folder containing CSV files.
+        max_workers : int | None
+            Number of threads reading files concurrently. None uses the
+            ThreadPoolExecutor default, 1 reads the files one after another.
+        store_path : str | None
+            Folder of a store built by compile_EPI_store. When given, the data is sliced
+            from the store (values as float32) and no CSV is read.
 
         Returns
         -------
@@ -97,51 +447,23 @@ class Data_Handler:
             Long-format DataFrame with columns:
             ['country', 'iso', 'variable', 'variable_name', 'year', 'value']
         """
-        all_dfs = []
-
-        for var, var_name in indicators.items():
-            filename = os.path.join(folder_path, f"{var}_ind_na.csv")
-            if not os.path.exists(filename):
-                raise FileNotFoundError(f"File {filename} not found.")
-
-            # Load CSV safely
-            df = pd.read_csv(filename)
-
-            # Standardize columns
-            df.columns = df.columns.str.strip().str.lower().str.replace(' ', '_')
-
-            # Identify year columns for this variable (e.g., bca.ind.1990)
-            year_cols = [col for col in df.columns if col.startswith(var.lower() + '.ind.')]
-
-            # Melt wide -> long
-            long_df = df.melt(
-                id_vars=['iso', 'country'],
-                value_vars=year_cols,
-                var_name='metric_year',
-                value_name='value'
-            )
+        if store_path is not None:
+            return Data_Handler._get_data_EPI_store(indicators, countries, start_year, end_year, store_path)
 
-            # Extract year and add metadata
-            long_df['year'] = long_df['metric_year'].str.split('.').str[-1].astype(int)
-            long_df['variable'] = var
-            long_df['variable_name'] = var_name
-            long_df = long_df.drop(columns='metric_year')
+        if indicators is None:
+            indicators = Data_Handler.get_EPI_indicators(folder_path)
 
-            all_dfs.append(long_df)
+        # Parse the files concurrently, map() keeps the indicator order
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            all_dfs = list(executor.map(
+                lambda item: Data_Handler._load_EPI_file(
+                    item[0], item[1], folder_path, countries, start_year, end_year
+                ),
+                indicators.items()
+            ))
 
-        # Combine multiple indicators
-        result = pd.concat(all_dfs, ignore_index=True)
-
-        # Filter by countries
-        if countries is not None:
-            if isinstance(countries, str):
-                countries = [countries]
-            result = result[result['country'].str.lower().isin([c.lower() for c in countries])]
-
-
-        result = result[(result['year'] >= start_year) & (result['year'] <= end_year)]
-
-        return result.reset_index(drop=True)
+        # Combine multiple indicators, each already filtered by country and year
+        return pd.concat(all_dfs, ignore_index=True)
 
     @staticmethod
     def get_data_WB(indicators, countries="all", start_year=None, end_year=None):
@@ -156,7 +478,8 @@ class Data_Handler:
             end_year (int): End year (optional)
 
         Returns:
-            pd.DataFrame: DataFrame with columns ['Country', 'Year', ...indicators...]
+            pd.DataFrame: DataFrame with columns ['Country', 'Year', ...indicators..., 'country_key'],
+                where country_key is the ISO3-derived categorical shared by all loaders
         """
         # Handle date range
         if start_year and end_year:
@@ -183,9 +506,12 @@ class Data_Handler:
         if pd.api.types.is_datetime64_any_dtype(df["Year"]):
             df["Year"] = df["Year"].dt.year
 
+        # Shared integer country key, resolved from the country names
+        df["country_key"] = Country_Resolver.country_key(Country_Resolver.resolve(df["Country"])["iso3"])
+
         # Reorder columns: Country, Year, then indicators
         indicator_columns = list(indicators.values())
-        cols = ["Country", "Year"] + indicator_columns
+        cols = ["Country", "Year"] + indicator_columns + ["country_key"]
         df = df[[c for c in cols if c in df.columns]]
 
         return df
@@ -194,7 +520,7 @@ class Data_Handler:
     def get_renewable_energy_data(file_path, start_year=1960, end_year=2024):
         """
         Reads a World Bank-style CSV and returns a tidy DataFrame
-        with columns: country, year, Renewable energy share.
+        with columns: country, year, Renewable energy share, country_key.
         Can filter data between start_year and end_year.
 
         Args:
@@ -210,10 +536,10 @@ class Data_Handler:
 
         # Keep only relevant columns for the requested years
         years = [str(y) for y in range(start_year, end_year + 1)]
-        df = df[['Country Name'] + years]
+        df = df[['Country Name', 'Country Code'] + years]
 
         # Melt the wide format into long format
-        df_long = df.melt(id_vars=['Country Name'],
+        df_long = df.melt(id_vars=['Country Name', 'Country Code'],
                           var_name='year',
                           value_name='Renewable energy share')
 
@@ -223,4 +549,143 @@ class Data_Handler:
         # Convert year to integer
         df_long['year'] = df_long['year'].astype(int)
 
+        # Shared integer country key from the ISO3 country code
+        df_long['country_key'] = Country_Resolver.country_key(df_long.pop('Country Code'))
+
         return df_long
+
+    @staticmethod
+    def merge_on_country_key(frames, how='outer'):
+        """
+        Merges country-year frames on the shared country_key and year instead of on
+        free-text country names.
+
+        Name and code columns ('country', 'Country', 'iso', 'iso3', 'region') are dropped
+        before merging, rows without a country_key (regional aggregates, unresolved names)
+        are left out, and one canonical 'country' column is added from the key.
+
+        Args:
+            frames (list[pd.DataFrame]): Wide frames with 'country_key', a 'year' (or 'Year')
+                column and one column per indicator.
+            how (str): Merge type passed to pd.DataFrame.merge.
+
+        Returns:
+            pd.DataFrame: Columns ['country', 'year', ...indicators..., 'country_key'].
+        """
+        name_columns = ['country', 'Country', 'iso', 'iso3', 'region']
+        keyed = []
+        for df in frames:
+            df = df.rename(columns={'Year': 'year'})
+            df = df.drop(columns=[c for c in name_columns if c in df.columns])
+            keyed.append(df[df['country_key'].notna()])
+
+        merged = reduce(lambda left, right: left.merge(right, on=['country_key', 'year'], how=how), keyed)
+        merged.insert(0, 'country', Country_Resolver.key_names(merged['country_key']).to_numpy())
+        merged.insert(1, 'year', merged.pop('year'))
+        merged['country_key'] = merged.pop('country_key')
+        return merged.reset_index(drop=True)
+
+    @staticmethod
+    def build_panel(hdi_indicators: dict = None, epi_indicators: dict = None, wb_indicators: dict = None,
+                    wb_csv_indicators: dict = None, start_year=1990, end_year=2024,
+                    hdi_path='HDR25_Composite_indices_complete_time_series.csv', epi_folder='P5_Indicator',
+                    epi_store_path=None, max_workers=None):
+        """
+        Builds the wide country x year panel from all sources in one pass.
+
+        Every source is read in wide form and written straight into one
+        (country, year, indicator) array indexed by country_key and year, so no long
+        frames, pivot tables or merges are needed.
+
+        Args:
+            hdi_indicators (dict): HDI metric prefix -> column name, e.g. {"gii": "GII"}.
+            epi_indicators (dict): EPI abbreviation -> column name, e.g. {"SPI": "Species protection index"}.
+            wb_indicators (dict): World Bank API indicator code -> column name, fetched with get_data_WB.
+            wb_csv_indicators (dict): Path of a World Bank-style CSV download -> column name, e.g.
+                {"API_EG.FEC.RNEW.ZS_DS2_en_csv_v2_130800.csv": "Renewable energy share"}.
+            start_year (int): First year of the panel.
+            end_year (int): Last year of the panel.
+            hdi_path (str): Path of the HDI dataset.
+            epi_folder (str): Folder containing the EPI CSV files.
+            epi_store_path (str): Store built by compile_EPI_store, read instead of the EPI CSVs.
+            max_workers (int): Number of threads reading EPI files concurrently.
+
+        Returns:
+            pd.DataFrame: Columns ['country', 'year', ...indicators..., 'country_key'] with one
+                row per year for every country found in any source, ordered by country_key and year.
+        """
+        years = np.arange(start_year, end_year + 1)
+        n_countries = len(Country_Resolver.iso3_categories())
+        blocks = []
+
+        def add_wide(name, country_key, col_years, values):
+            # values has one row per country_key and one column per entry of col_years
+            rows = np.flatnonzero(country_key.codes >= 0)
+            cols = np.flatnonzero((col_years >= start_year) & (col_years <= end_year))
+            blocks.append((name, country_key.codes[rows], col_years[cols] - start_year,
+                           np.asarray(values, dtype=np.float64)[np.ix_(rows, cols)]))
+
+        if hdi_indicators:
+            if pq is not None:
+                cache_dir = os.path.join(os.path.dirname(os.path.abspath(hdi_path)), HDI_CACHE_DIR)
+                df = Data_Handler._read_HDI_cached(hdi_path, hdi_indicators, cache_dir, start_year, end_year)
+            else:
+                df = Data_Handler._read_HDI_csv(hdi_path, hdi_indicators, start_year, end_year)
+            country_key = Country_Resolver.country_key(df['iso3'])
+            for prefix, name in hdi_indicators.items():
+                cols = [col for col in df.columns if col.rsplit('_', 1)[0] == prefix and col not in HDI_ID_COLUMNS]
+                col_years = np.array([int(col.rsplit('_', 1)[1]) for col in cols], dtype=np.int64)
+                add_wide(name, country_key, col_years, df[cols].to_numpy(dtype=np.float64))
+
+        if epi_indicators:
+            if epi_store_path is not None:
+                values, index = Data_Handler.load_EPI_store(epi_store_path)
+                positions = {var: i for i, var in enumerate(index['variables'])}
+                country_key = Country_Resolver.country_key(index['iso'])
+                col_years = np.array(index['years'], dtype=np.int64)
+                for var, name in epi_indicators.items():
+                    add_wide(name, country_key, col_years, values[positions[var]])
+            else:
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    files = list(executor.map(lambda var: Data_Handler._read_EPI_file(var, epi_folder), epi_indicators))
+                for name, (df, year_cols, col_years) in zip(epi_indicators.values(), files):
+                    add_wide(name, Country_Resolver.country_key(df['iso']), col_years, df[year_cols].to_numpy(dtype=np.float64))
+
+        for path, name in (wb_csv_indicators or {}).items():
+            df = pd.read_csv(path, skiprows=4)
+            year_cols = [col for col in df.columns if col.isdigit()]
+            add_wide(name, Country_Resolver.country_key(df['Country Code']),
+                     np.array(year_cols, dtype=np.int64), df[year_cols].to_numpy(dtype=np.float64))
+
+        if wb_indicators:
+            df = Data_Handler.get_data_WB(wb_indicators, start_year=start_year, end_year=end_year)
+            rows = np.flatnonzero(df['country_key'].cat.codes.to_numpy() >= 0)
+            year_pos = df['Year'].to_numpy(dtype=np.int64)[rows] - start_year
+            rows = rows[(year_pos >= 0) & (year_pos < len(years))]
+            for name in wb_indicators.values():
+                if name in df.columns:
+                    # One row per country-year, written point by point
+                    blocks.append((name, df['country_key'].cat.codes.to_numpy()[rows],
+                                   df['Year'].to_numpy(dtype=np.int64)[rows] - start_year,
+                                   df[name].to_numpy(dtype=np.float64)[rows]))
+
+        # Align every block on the shared country_key x year grid
+        names = list(dict.fromkeys(name for name, _, _, _ in blocks))
+        column = {name: i for i, name in enumerate(names)}
+        panel = np.full((n_countries, len(years), len(names)), np.nan)
+        seen = np.zeros(n_countries, dtype=bool)
+        for name, codes, year_pos, values in blocks:
+            if values.ndim == 2:
+                panel[codes[:, None], year_pos[None, :], column[name]] = values
+            else:
+                panel[codes, year_pos, column[name]] = values
+            seen[codes] = True
+
+        # Keep countries found in any source
+        codes = np.flatnonzero(seen)
+        result = pd.DataFrame(panel[codes].reshape(len(codes) * len(years), len(names)), columns=names)
+        country_key = pd.Categorical.from_codes(np.repeat(codes, len(years)), Country_Resolver.iso3_categories())
+        result.insert(0, 'country', Country_Resolver.key_names(country_key).to_numpy())
+        result.insert(1, 'year', np.tile(years, len(codes)))
+        result['country_key'] = country_key
+        return result
@@ -0,0 +1,140 @@
+import numpy as np
+import pandas as pd
+
+from panel import ALL_MISSING_FILLS
+
+# Indicators whose series are left out of the missing-data shares for countries that
+# have no value at all, as in the notebook's nan_mean_excluding_marine
+EXCLUDE_ALL_MISSING = tuple(ALL_MISSING_FILLS)
+
+
+class Missingness_Profiler:
+    @staticmethod
+    def exclusion_mask(panel, exclude_all_missing=EXCLUDE_ALL_MISSING):
+        """
+        Returns a (country, 1, indicator) boolean mask marking the series of `exclude_all_missing`
+        indicators that are missing in every year for a country. Indicators not in the panel
+        are skipped.
+        """
+        excluded = np.zeros((panel.shape[0], 1, panel.shape[2]), dtype=bool)
+        for indicator in exclude_all_missing or ():
+            if indicator in panel.indicators:
+                i = panel.indicators.index(indicator)
+                excluded[:, 0, i] = np.isnan(panel.values[:, :, i]).all(axis=1)
+        return excluded
+
+    @staticmethod
+    def profile(panel, exclude_all_missing=EXCLUDE_ALL_MISSING, exclude=None):
+        """
+        Missing-data shares of a panel by year, country and indicator, and the country x indicator
+        completeness matrix, all reduced from one boolean mask of the (country, year, indicator) cube.
+
+        Every share is missing cells / counted cells in percent. Without exclusions this equals the
+        notebook's groupby(...).apply(lambda x: x.isna().mean().mean() * 100), and by_country with
+        the default exclusion equals nan_mean_excluding_marine.
+
+        Args:
+            panel (Panel): Panel to profile.
+            exclude_all_missing (tuple): Indicators not counted for countries where they are missing
+                in every year, see exclusion_mask.
+            exclude (np.ndarray): Optional extra boolean mask, broadcastable to the panel's shape,
+                of cells not to count.
+
+        Returns:
+            dict: {'by_year': pd.Series, 'by_country': pd.Series, 'by_indicator': pd.Series of missing %,
+                   'completeness': pd.DataFrame of available % per country (rows) and indicator (columns),
+                   NaN where nothing is counted}
+        """
+        excluded = Missingness_Profiler.exclusion_mask(panel, exclude_all_missing)
+        if exclude is not None:
+            excluded = excluded | np.asarray(exclude, dtype=bool)
+        counted = np.broadcast_to(~excluded, panel.shape)
+        missing = np.isnan(panel.values) & counted
+
+        # Two reductions of the cube; every marginal is a sum of one of them
+        missing_cy = np.count_nonzero(missing, axis=2)
+        missing_ci = np.count_nonzero(missing, axis=1)
+        counted_cy = np.count_nonzero(counted, axis=2)
+        counted_ci = np.count_nonzero(counted, axis=1)
+
+        def share(missing_count, counted_count):
+            return np.divide(100 * missing_count, counted_count,
+                             out=np.full(np.shape(missing_count), np.nan), where=counted_count > 0)
+
+        countries = pd.Index(panel.countries, name='country')
+        indicators = pd.Index(panel.indicators, name='indicator')
+        return {
+            'by_year': pd.Series(share(missing_cy.sum(0), counted_cy.sum(0)),
+                                 index=pd.Index(panel.years, name='year')),
+            'by_country': pd.Series(share(missing_ci.sum(1), counted_ci.sum(1)), index=countries),
+            'by_indicator': pd.Series(share(missing_ci.sum(0), counted_ci.sum(0)), index=indicators),
+            'completeness': pd.DataFrame(100 - share(missing_ci, counted_ci), index=countries,
+                                         columns=indicators),
+        }
+
+
+class Availability_Bitmaps:
+    """
+    Year-availability bitmaps of a panel: bit y of words[c, i] is set when country c has a
+    value for indicator i in the panel's y-th year. Built once per panel, after which
+    coverage and eligibility queries for any indicator set and year window are popcounts
+    over a few uint64 words per country instead of a pass over the data.
+    """
+
+    def __init__(self, panel, exclude_all_missing=EXCLUDE_ALL_MISSING):
+        self.countries = panel.countries
+        self.years = panel.years
+        self.indicators = list(panel.indicators)
+        # Series not counted at all, see Missingness_Profiler.exclusion_mask
+        self.excluded = Missingness_Profiler.exclusion_mask(panel, exclude_all_missing)[:, 0, :]
+
+        n_countries, n_years, n_indicators = panel.shape
+        n_words = max(1, -(-n_years // 64))
+        available = np.zeros((n_countries, n_indicators, n_words * 64), dtype=bool)
+        available[:, :, :n_years] = ~np.isnan(panel.values).transpose(0, 2, 1)
+        self.words = np.packbits(available, axis=2, bitorder='little').view('<u8')
+
+    @staticmethod
+    def _popcount(words):
+        if hasattr(np, 'bitwise_count'):
+            return np.bitwise_count(words)
+        table = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+        return table[words.view(np.uint8)].reshape(words.shape + (8,)).sum(axis=-1)
+
+    def _window(self, start_year, end_year):
+        in_window = np.ones(len(self.years), dtype=bool)
+        if start_year is not None:
+            in_window &= self.years >= start_year
+        if end_year is not None:
+            in_window &= self.years <= end_year
+        bits = np.zeros(self.words.shape[-1] * 64, dtype=bool)
+        bits[:len(self.years)] = in_window
+        return np.packbits(bits, bitorder='little').view('<u8'), int(in_window.sum())
+
+    def coverage(self, indicators=None, start_year=None, end_year=None):
+        """
+        Returns the share (%) of counted indicator-years with a value, per country, for the
+        given indicators (default all) and inclusive year window (default all years).
+        Countries with nothing counted get NaN.
+        """
+        positions = slice(None)
+        if indicators is not None:
+            indicators = [indicators] if isinstance(indicators, str) else list(indicators)
+            missing = [i for i in indicators if i not in self.indicators]
+            if missing:
+                raise KeyError(f"Indicators {missing} not in panel.")
+            positions = [self.indicators.index(i) for i in indicators]
+
+        window, n_years = self._window(start_year, end_year)
+        available = self._popcount(self.words[:, positions] & window).sum(axis=(1, 2), dtype=np.int64)
+        counted = n_years * np.count_nonzero(~self.excluded[:, positions], axis=1)
+        share = np.divide(100 * available, counted, out=np.full(len(available), np.nan), where=counted > 0)
+        return pd.Series(share, index=pd.Index(self.countries, name='country'))
+
+    def eligible(self, min_coverage, indicators=None, start_year=None, end_year=None):
+        """
+        Returns the countries whose coverage (see coverage) is at least `min_coverage` percent,
+        e.g. eligible(70) keeps the notebook's countries with at most 30% missing data.
+        """
+        coverage = self.coverage(indicators, start_year, end_year)
+        return coverage.index[coverage.to_numpy() >= min_coverage]
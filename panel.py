@@ -0,0 +1,309 @@
+import numpy as np
+import pandas as pd
+
+from country_resolver import Country_Resolver
+
+# Indicators set to a constant for countries with no value at all, e.g. landlocked
+# countries have no marine habitat to protect
+ALL_MISSING_FILLS = {'Marine Habitat Protection': 100}
+
+# Codes of the mask returned by Panel.impute, in the order the rules are applied
+IMPUTED_NONE = 0  # observed value, or still missing
+IMPUTED_CONSTANT = 1
+IMPUTED_INTERPOLATED = 2
+IMPUTED_CONTINENT_MEAN = 3
+IMPUTATION_RULES = ('none', 'constant', 'interpolated', 'continent_mean')
+
+
+class Panel:
+    """
+    Dense country x year x indicator panel.
+
+    Backed by a single float32 array `values` shaped (country, year, indicator) with NaN
+    for missing values, plus index tables: `iso3`, `countries` (names) and `continents`
+    per country, `years` and `indicators`. Slicing by a single year, a year range or
+    an indicator returns views of `values`; selecting countries by name, ISO3 code or
+    continent copies only the selected rows.
+    """
+
+    def __init__(self, values, iso3, years, indicators, countries=None, continents=None):
+        values = np.asarray(values, dtype=np.float32)
+        if values.shape != (len(iso3), len(years), len(indicators)):
+            raise ValueError(
+                f"values has shape {values.shape}, expected {(len(iso3), len(years), len(indicators))}"
+            )
+
+        self.values = values
+        self.iso3 = np.asarray(iso3, dtype=object)
+        self.years = np.asarray(years, dtype=np.int64)
+        self.indicators = list(indicators)
+
+        if countries is None or continents is None:
+            index = Country_Resolver.load_index()['countries']
+            if countries is None:
+                countries = [index.get(code, {}).get('country', code) for code in self.iso3]
+            if continents is None:
+                continents = [index.get(code, {}).get('continent') or 'Unknown' for code in self.iso3]
+        self.countries = np.asarray(countries, dtype=object)
+        self.continents = np.asarray(continents, dtype=object)
+        self._availability = None
+
+    def __repr__(self):
+        return (f"Panel({len(self.iso3)} countries x {len(self.years)} years "
+                f"({self.years.min() if len(self.years) else '-'}-{self.years.max() if len(self.years) else '-'}) "
+                f"x {len(self.indicators)} indicators)")
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    @property
+    def availability(self):
+        """
+        Year-availability bitmaps of the panel (missingness.Availability_Bitmaps), built on
+        first use and reused for every later coverage or eligibility query.
+        """
+        if self._availability is None:
+            from missingness import Availability_Bitmaps  # missingness imports this module
+            self._availability = Availability_Bitmaps(self)
+        return self._availability
+
+    @staticmethod
+    def from_frame(df, indicators=None, country_column='country_key', year_column='year'):
+        """
+        Builds a panel from a wide country-year frame such as Data_Handler.build_panel's output.
+
+        Args:
+            df (pd.DataFrame): One row per country and year, one column per indicator.
+            indicators (list): Indicator columns, defaults to every numeric column except the
+                year and the country columns.
+            country_column (str): Column holding ISO3 codes or the country_key categorical.
+            year_column (str): Column holding the year.
+        """
+        if indicators is None:
+            skip = {year_column, country_column, 'country', 'continent', 'iso', 'iso3'}
+            indicators = [c for c in df.select_dtypes(include='number').columns if c not in skip]
+
+        iso3, country_pos = np.unique(np.asarray(df[country_column], dtype=object).astype(str), return_inverse=True)
+        years, year_pos = np.unique(df[year_column].to_numpy(dtype=np.int64), return_inverse=True)
+
+        values = np.full((len(iso3), len(years), len(indicators)), np.nan, dtype=np.float32)
+        values[country_pos, year_pos] = df[indicators].to_numpy(dtype=np.float32)
+
+        countries = None
+        if 'country' in df.columns and country_column != 'country':
+            countries = np.empty(len(iso3), dtype=object)
+            countries[country_pos] = df['country'].to_numpy(dtype=object)
+        return Panel(values, iso3, years, indicators, countries=countries)
+
+    def _country_positions(self, countries):
+        if isinstance(countries, str):
+            countries = [countries]
+        lookup = {}
+        for i, (code, name) in enumerate(zip(self.iso3, self.countries)):
+            lookup.setdefault(str(code).lower(), i)
+            lookup.setdefault(str(name).lower(), i)
+        missing = [c for c in countries if c.lower() not in lookup]
+        if missing:
+            raise KeyError(f"Countries {missing} not in panel.")
+        return np.array([lookup[c.lower()] for c in countries], dtype=np.intp)
+
+    def _indicator_positions(self, indicators):
+        if isinstance(indicators, str):
+            indicators = [indicators]
+        missing = [i for i in indicators if i not in self.indicators]
+        if missing:
+            raise KeyError(f"Indicators {missing} not in panel.")
+        return [self.indicators.index(i) for i in indicators]
+
+    def sel(self, countries=None, continents=None, start_year=None, end_year=None, indicators=None):
+        """
+        Returns the sub-panel for the given countries (names or ISO3 codes), continents,
+        inclusive year range and indicators. Year ranges and a single indicator keep
+        `values` a view of this panel.
+        """
+        rows = slice(None)
+        if countries is not None or continents is not None:
+            mask = np.ones(len(self.iso3), dtype=bool)
+            if countries is not None:
+                mask &= np.isin(np.arange(len(self.iso3)), self._country_positions(countries))
+            if continents is not None:
+                mask &= np.isin(self.continents, [continents] if isinstance(continents, str) else list(continents))
+            rows = np.flatnonzero(mask)
+
+        start = 0 if start_year is None else int(np.searchsorted(self.years, start_year, side='left'))
+        stop = len(self.years) if end_year is None else int(np.searchsorted(self.years, end_year, side='right'))
+        cols = slice(start, stop)
+
+        indicator_names = self.indicators
+        depth = slice(None)
+        if indicators is not None:
+            positions = self._indicator_positions(indicators)
+            indicator_names = [self.indicators[i] for i in positions]
+            depth = slice(positions[0], positions[0] + 1) if len(positions) == 1 else positions
+
+        values = self.values[rows][:, cols][:, :, depth]
+        return Panel(values, self.iso3[rows], self.years[cols], indicator_names,
+                     countries=self.countries[rows], continents=self.continents[rows])
+
+    def year(self, year):
+        """
+        Returns a country x indicator frame for one year, backed by a view of `values`.
+        """
+        pos = np.searchsorted(self.years, year)
+        if pos == len(self.years) or self.years[pos] != year:
+            raise KeyError(f"Year {year} not in panel.")
+        return pd.DataFrame(self.values[:, pos, :], index=pd.Index(self.countries, name='country'),
+                            columns=self.indicators, copy=False)
+
+    def indicator(self, indicator):
+        """
+        Returns a country x year frame for one indicator, backed by a view of `values`.
+        """
+        pos = self._indicator_positions(indicator)[0]
+        return pd.DataFrame(self.values[:, :, pos], index=pd.Index(self.countries, name='country'),
+                            columns=pd.Index(self.years, name='year'), copy=False)
+
+    def country(self, country):
+        """
+        Returns a year x indicator frame for one country (name or ISO3 code), backed by a view.
+        """
+        pos = self._country_positions(country)[0]
+        return pd.DataFrame(self.values[pos], index=pd.Index(self.years, name='year'),
+                            columns=self.indicators, copy=False)
+
+    @staticmethod
+    def interpolate_array(values, axis=1):
+        """
+        Linearly interpolates NaN gaps along `axis` for every other position at once.
+
+        Matches pandas' interpolate(method='linear', limit_direction='both') applied to each
+        series separately: interior gaps are filled on a straight line between the nearest
+        valid neighbours, leading and trailing gaps take the nearest valid value, and series
+        with no valid value stay NaN.
+
+        Args:
+            values (np.ndarray): Float array, e.g. a (country, year, indicator) cube.
+            axis (int): Axis to interpolate along.
+
+        Returns:
+            np.ndarray: Interpolated copy of `values` with the same dtype.
+        """
+        moved = np.moveaxis(np.asarray(values), axis, -1)
+        series = moved.reshape(-1, moved.shape[-1]).astype(np.float64)
+        n = series.shape[1]
+
+        valid = ~np.isnan(series)
+        positions = np.arange(n)
+        # Position of the nearest valid value at or before / at or after each point
+        prev = np.maximum.accumulate(np.where(valid, positions, -1), axis=1)
+        next_ = np.minimum.accumulate(np.where(valid, positions, n)[:, ::-1], axis=1)[:, ::-1]
+
+        # Edges copy the only neighbour there is, so both ends point at the same value
+        prev_edge, next_edge = prev < 0, next_ >= n
+        prev = np.where(prev_edge, next_, prev)
+        next_ = np.where(next_edge, prev, next_)
+        empty = prev_edge & next_edge
+        prev[empty] = next_[empty] = 0
+
+        rows = np.arange(series.shape[0])[:, None]
+        left, right = series[rows, prev], series[rows, next_]
+        # Same operation order as np.interp, which pandas uses, so results match bit for bit
+        span = next_ - prev
+        slope = np.divide(right - left, span, out=np.zeros(series.shape), where=span > 0)
+        filled = np.where(valid, series, slope * (positions - prev) + left)
+        filled[empty] = np.nan
+
+        return np.moveaxis(filled.reshape(moved.shape).astype(values.dtype, copy=False), -1, axis)
+
+    def interpolate(self):
+        """
+        Returns a copy of the panel with every country's indicator series linearly
+        interpolated across years, see interpolate_array.
+        """
+        return Panel(Panel.interpolate_array(self.values, axis=1), self.iso3, self.years, self.indicators,
+                     countries=self.countries, continents=self.continents)
+
+    @staticmethod
+    def group_mean_array(values, groups):
+        """
+        Returns the NaN-ignoring mean over countries in the same group, for every year and
+        indicator, broadcast back to each country's row.
+
+        Args:
+            values (np.ndarray): (country, year, indicator) cube.
+            groups (array-like): Group label of each country, e.g. its continent.
+
+        Returns:
+            np.ndarray: float64 cube shaped like `values`, NaN where a group has no value.
+        """
+        labels, codes = np.unique(np.asarray(groups, dtype=object).astype(str), return_inverse=True)
+        flat = values.reshape(len(codes), -1)
+        valid = ~np.isnan(flat)
+
+        # One indicator matrix product sums every group at once
+        membership = np.zeros((len(labels), len(codes)))
+        membership[codes, np.arange(len(codes))] = 1
+        sums = membership @ np.where(valid, flat, 0).astype(np.float64)
+        counts = membership @ valid.astype(np.float64)
+        means = np.divide(sums, counts, out=np.full(sums.shape, np.nan), where=counts > 0)
+        return means[codes].reshape(values.shape)
+
+    def impute(self, all_missing_fills=ALL_MISSING_FILLS, interpolate=True, continent_mean=True):
+        """
+        Fills missing values with the notebook's cascade, each step applied to all
+        indicators at once:
+
+        1. constant fills for countries with no value at all for an indicator
+           (`all_missing_fills`, by default Marine Habitat Protection -> 100),
+        2. linear interpolation across years within each country,
+        3. the mean of the country's continent in the same year.
+
+        Args:
+            all_missing_fills (dict): {indicator: value}, indicators not in the panel are skipped.
+            interpolate (bool): Whether to run step 2.
+            continent_mean (bool): Whether to run step 3.
+
+        Returns:
+            tuple: (imputed Panel, uint8 mask shaped like `values` holding the IMPUTED_* code
+                of the rule that filled each cell, see IMPUTATION_RULES)
+        """
+        values = self.values.copy()
+        mask = np.zeros(values.shape, dtype=np.uint8)
+
+        for indicator, fill in (all_missing_fills or {}).items():
+            if indicator not in self.indicators:
+                continue
+            i = self.indicators.index(indicator)
+            empty = np.isnan(values[:, :, i]).all(axis=1)
+            values[empty, :, i] = fill
+            mask[empty, :, i] = IMPUTED_CONSTANT
+
+        steps = []
+        if interpolate:
+            steps.append((IMPUTED_INTERPOLATED, lambda v: Panel.interpolate_array(v, axis=1)))
+        if continent_mean:
+            steps.append((IMPUTED_CONTINENT_MEAN, lambda v: Panel.group_mean_array(v, self.continents)))
+        for code, fill in steps:
+            missing = np.isnan(values)
+            values = np.where(missing, fill(values), values).astype(np.float32, copy=False)
+            mask[missing & ~np.isnan(values)] = code
+
+        panel = Panel(values, self.iso3, self.years, self.indicators,
+                      countries=self.countries, continents=self.continents)
+        return panel, mask
+
+    def to_frame(self):
+        """
+        Exports the panel as a wide frame with one row per country and year, in the layout of
+        Data_Handler.build_panel plus a 'continent' column. The indicator columns share
+        memory with `values`.
+        """
+        n_countries, n_years, n_indicators = self.values.shape
+        flat = self.values.reshape(n_countries * n_years, n_indicators)
+        df = pd.DataFrame(flat, columns=self.indicators, copy=False)
+        df.insert(0, 'country', np.repeat(self.countries, n_years))
+        df.insert(1, 'year', np.tile(self.years, n_countries))
+        df.insert(2, 'continent', np.repeat(self.continents, n_years))
+        df['iso3'] = np.repeat(self.iso3, n_years)
+        return df